@@ -1,13 +1,31 @@
+import time
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
-from twelvelabs import TwelveLabs
-from twelvelabs.models.search import SearchData, GroupByVideoSearchData
 import requests
 import os
+import io
+import atexit
 from dotenv import load_dotenv
 import threading
-from apscheduler.schedulers.background import BackgroundScheduler
-import time
+from datetime import datetime, timedelta
+from olympics.cache import TTLCache, SQLiteCache, TieredCache
+from olympics.circuit_breaker import CircuitBreaker, CLOSED
+from olympics.class_store import ClassStore, clean_prompts
+from olympics.client import LazyClient, twelvelabs_client
+from olympics.export import export_outcomes, parquet_available
+from olympics.classes import INITIAL_CLASSES, PromptClassIndex
+from olympics.merging import merge_videos, FUSION_METHODS
+from olympics.metrics import Metrics
+from olympics.pagination import PagedResults
+from olympics.prewarm import PrewarmJob
+from olympics.prompt_index import PromptIndex
+from olympics.rate_limit import RequestScheduler, PRIORITY_BACKGROUND
+from olympics.search_engine import ConcurrentSearchEngine
+from olympics.singleflight import SingleFlight
+from olympics.video_resolver import VideoResolver, hls_url, hls_thumbnail
 
+IMPORTS_FINISHED = time.perf_counter()
 
 load_dotenv()
 
@@ -21,17 +39,107 @@ def keep_alive():
         print(f"Keep-alive ping failed: {str(e)}")
 
 
-scheduler = BackgroundScheduler()
-scheduler.add_job(keep_alive, 'interval', minutes=10)
-scheduler.start()
-
 API_KEY = os.getenv("API_KEY")
 
 BASE_URL = "https://api.twelvelabs.io/v1.2"
 
 INDEX_ID = os.getenv("INDEX_ID")
 
-client = TwelveLabs(api_key=API_KEY)
+SEARCH_BATCH_SIZE = int(os.getenv("SEARCH_BATCH_SIZE", "5"))
+SEARCH_BATCH_DEFAULT = os.getenv("SEARCH_BATCH_DEFAULT", "false").lower() in ("1", "true", "yes")
+
+MERGE_FUSION = os.getenv("RESULT_FUSION", "max")
+if MERGE_FUSION not in FUSION_METHODS:
+    raise ValueError(f"RESULT_FUSION must be one of {', '.join(FUSION_METHODS)}, got '{MERGE_FUSION}'")
+
+INCREMENTAL_SEARCH = os.getenv("INCREMENTAL_SEARCH", "true").lower() in ("1", "true", "yes")
+
+RESULTS_PER_PAGE = 3
+MAX_RESULTS_PER_PROMPT = int(os.getenv("MAX_RESULTS_PER_PROMPT", "50"))
+
+LAZY_VIDEO_PLAYER = os.getenv("LAZY_VIDEO_PLAYER", "true").lower() in ("1", "true", "yes")
+
+
+@st.cache_resource
+def get_client():
+    # The SDK is imported on the first search rather than on every rerun.
+    return LazyClient(lambda: twelvelabs_client(API_KEY))
+
+
+@st.cache_resource
+def get_search_cache():
+    ttl = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    # Expired results are kept a while longer to serve during API outages.
+    stale_ttl = float(os.getenv("SEARCH_CACHE_STALE_TTL", "86400"))
+    memory = TTLCache(maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "512")), ttl=ttl, stale_ttl=stale_ttl)
+    disk = None
+    cache_path = os.getenv("SEARCH_CACHE_PATH")
+    if cache_path:
+        disk = SQLiteCache(cache_path, maxsize=int(os.getenv("SEARCH_CACHE_DISK_SIZE", "10000")), ttl=ttl, stale_ttl=stale_ttl)
+    return TieredCache(memory, disk)
+
+
+@st.cache_resource
+def get_request_scheduler():
+    # Shared by every session so all outbound Twelve Labs calls respect one quota.
+    return RequestScheduler(
+        rate=float(os.getenv("API_RATE_LIMIT", "10")),
+        burst=int(os.getenv("API_RATE_BURST", "20"))
+    )
+
+
+@st.cache_resource
+def get_metrics():
+    return Metrics()
+
+
+def build_breaker(name):
+    return CircuitBreaker(
+        name,
+        failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+        slow_call_seconds=float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "10")),
+        metrics=get_metrics()
+    )
+
+
+@st.cache_resource
+def get_search_breaker():
+    # Shared by every session: once searches keep failing, all of them
+    # switch to cached results instead of waiting on the API.
+    return build_breaker("search")
+
+
+@st.cache_resource
+def get_video_breaker():
+    return build_breaker("video")
+
+
+@st.cache_resource
+def get_prompt_index():
+    # Prompts searched so far, for reusing a near-duplicate prompt's cached results.
+    return PromptIndex(max_prompts=int(os.getenv("PROMPT_INDEX_SIZE", "5000")))
+
+
+@st.cache_resource
+def get_single_flight():
+    # Identical searches running in different sessions share one API call.
+    return SingleFlight()
+
+
+search_engine = ConcurrentSearchEngine(
+    get_client(),
+    INDEX_ID,
+    max_workers=int(os.getenv("SEARCH_MAX_WORKERS", "8")),
+    timeout=float(os.getenv("SEARCH_TIMEOUT", "30")),
+    cache=get_search_cache(),
+    scheduler=get_request_scheduler(),
+    single_flight=get_single_flight(),
+    metrics=get_metrics(),
+    prompt_index=get_prompt_index(),
+    reuse_threshold=float(os.getenv("PROMPT_REUSE_THRESHOLD", "0.85")),
+    breaker=get_search_breaker()
+)
 
 page_element = """
 <style>
@@ -47,96 +155,518 @@ page_element = """
     background-size: cover;
 }
 </style>
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+
+.stApp {
+    font-family: 'Inter', sans-serif;
+    background-color: #ffffff;
+}
+
+.big-font {
+    font-size: 48px !important;
+    font-weight: 700;
+    color: #667eea;
+    text-align: center;
+    margin-bottom: 40px;
+    letter-spacing: -1px;
+}
+
+.subheader {
+    font-size: 28px;
+    font-weight: 600;
+    color: #1a202c;
+    margin-top: 30px;
+    margin-bottom: 20px;
+    border-bottom: 3px solid #667eea;
+    padding-bottom: 10px;
+    display: inline-block;
+}
+
+.category-header {
+    font-size: 24px;
+    font-weight: 600;
+    color: #2d3748;
+    background-color: #f7fafc;
+    padding: 20px 25px;
+    border-radius: 15px;
+    margin: 30px 0 20px 0;
+    border-left: 5px solid #667eea;
+    box-shadow: 0 4px 20px rgba(102, 126, 234, 0.1);
+    position: relative;
+    overflow: hidden;
+}
+
+.category-header::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 2px;
+    background-color: #667eea;
+}
+
+.prompt-header {
+    font-size: 20px;
+    font-weight: 500;
+    color: #2d3748;
+    background-color: #f0fff4;
+    padding: 15px 20px;
+    border-radius: 12px;
+    margin: 25px 0 15px 0;
+    border-left: 4px solid #38a169;
+    box-shadow: 0 2px 10px rgba(56, 161, 105, 0.1);
+    position: relative;
+}
+
+.prompt-header::before {
+    content: '🎯';
+    position: absolute;
+    right: 20px;
+    top: 50%;
+    transform: translateY(-50%);
+    font-size: 18px;
+}
+
+/* Multiselect styling */
+.stMultiSelect > label {
+    color: #1a202c !important;
+    font-weight: 600 !important;
+    font-size: 16px !important;
+    animation: pulse 2s infinite;
+}
+
+.stMultiSelect > div > div {
+    border-radius: 12px;
+    border: 2px solid #e2e8f0;
+    transition: all 0.3s ease;
+    background-color: #ffffff !important;
+}
+
+.stMultiSelect > div > div:focus-within {
+    border-color: #667eea;
+    box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
+}
+
+.stMultiSelect [data-baseweb="select"] {
+    color: #1a202c !important;
+}
+
+.stMultiSelect [data-baseweb="select"] > div {
+    color: #1a202c !important;
+    background-color: #ffffff !important;
+}
+
+/* Text input styling */
+.stTextInput > label {
+    color: #1a202c !important;
+    font-weight: 600 !important;
+    font-size: 16px !important;
+    animation: pulse 2s infinite;
+}
+
+.stTextInput > div > div > input {
+    color: #1a202c !important;
+    background-color: #ffffff !important;
+}
+
+/* Pulse animation */
+@keyframes pulse {
+    0% {
+        opacity: 1;
+    }
+    50% {
+        opacity: 0.7;
+        transform: scale(1.02);
+    }
+    100% {
+        opacity: 1;
+    }
+}
+
+.stButton>button {
+    width: 100%;
+    background-color: #667eea;
+    color: white;
+    border: none;
+    border-radius: 12px;
+    padding: 15px 30px;
+    font-weight: 600;
+    font-size: 16px;
+    transition: all 0.3s ease;
+    box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
+}
+
+.stButton>button:hover {
+    background-color: #5a67d8;
+    transform: translateY(-2px);
+    box-shadow: 0 6px 25px rgba(102, 126, 234, 0.4);
+}
+
+.video-card {
+    background-color: #ffffff;
+    border-radius: 20px;
+    padding: 25px;
+    margin-bottom: 20px;
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.08);
+    border: 1px solid rgba(102, 126, 234, 0.1);
+    position: relative;
+    overflow: hidden;
+}
+
+.video-card::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 3px;
+    background-color: #667eea;
+}
+
+.video-meta {
+    font-size: 15px;
+    color: #4a5568;
+    background-color: #f7fafc;
+    padding: 12px 16px;
+    border-radius: 10px;
+    margin: 8px 0;
+    border-left: 3px solid #e2e8f0;
+    font-weight: 500;
+}
+
+.confidence-high {
+    color: #38a169;
+    font-weight: 700;
+    background-color: rgba(56, 161, 105, 0.1);
+    padding: 4px 8px;
+    border-radius: 6px;
+}
+
+.confidence-medium {
+    color: #d69e2e;
+    font-weight: 700;
+    background-color: rgba(214, 158, 46, 0.1);
+    padding: 4px 8px;
+    border-radius: 6px;
+}
+
+.confidence-low {
+    color: #e53e3e;
+    font-weight: 700;
+    background-color: rgba(229, 62, 62, 0.1);
+    padding: 4px 8px;
+    border-radius: 6px;
+}
+
+.stTabs [data-baseweb="tab-list"] {
+    gap: 30px;
+    background-color: #f7fafc;
+    padding: 10px 20px;
+    border-radius: 15px;
+    margin-bottom: 30px;
+    box-shadow: 0 4px 20px rgba(0, 0, 0, 0.05);
+}
+
+.stTabs [data-baseweb="tab"] {
+    height: 60px;
+    background: transparent;
+    border-radius: 12px;
+    padding: 15px 25px;
+    font-weight: 600;
+    font-size: 16px;
+    color: #4a5568;
+    transition: all 0.3s ease;
+}
+
+.stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {
+    background-color: #667eea;
+    color: white;
+    box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
+}
+
+.custom-container {
+    background-color: #ffffff;
+    border-radius: 20px;
+    padding: 30px;
+    margin: 20px 0;
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.08);
+    border: 1px solid rgba(102, 126, 234, 0.1);
+}
+
+.footer-style {
+    background-color: #667eea;
+    color: white;
+    text-align: center;
+    padding: 30px;
+    border-radius: 20px;
+    margin-top: 50px;
+    box-shadow: 0 8px 32px rgba(102, 126, 234, 0.2);
+}
+
+.footer-style a {
+    color: #ffffff;
+    text-decoration: none;
+    font-weight: 600;
+    transition: all 0.3s ease;
+    padding: 5px 10px;
+    border-radius: 8px;
+}
+
+.footer-style a:hover {
+    background-color: rgba(255, 255, 255, 0.2);
+    transform: translateY(-1px);
+}
+</style>
 """
+# All static CSS goes out as a single element per rerun.
 st.markdown(page_element, unsafe_allow_html=True)
 
 
 @st.cache_data
 def get_initial_classes():
-    return [
-        {"name": "AquaticSports", "prompts": ["swimming competition", "diving event", "water polo match", "synchronized swimming", "open water swimming"]},
-        {"name": "AthleticEvents", "prompts": ["track and field", "marathon running", "long jump competition", "javelin throw", "high jump event"]},
-        {"name": "GymnasticsEvents", "prompts": ["artistic gymnastics", "rhythmic gymnastics", "trampoline gymnastics", "balance beam routine", "floor exercise performance"]},
-        {"name": "CombatSports", "prompts": ["boxing match", "judo competition", "wrestling bout", "taekwondo fight", "fencing duel"]},
-        {"name": "TeamSports", "prompts": ["basketball game", "volleyball match", "football (soccer) match", "handball game", "field hockey competition"]},
-        {"name": "CyclingSports", "prompts": ["road cycling race", "track cycling event", "mountain bike competition", "BMX racing", "cycling time trial"]},
-        {"name": "RacquetSports", "prompts": ["tennis match", "badminton game", "table tennis competition", "squash game", "tennis doubles match"]},
-        {"name": "RowingAndSailing", "prompts": ["rowing competition", "sailing race", "canoe sprint", "kayak event", "windsurfing competition"]}
-    ]
+    return INITIAL_CLASSES
  
+@st.cache_resource
+def get_class_store():
+    return ClassStore(os.getenv("CLASS_STORE_PATH", ".cache/classes.sqlite3"))
+
 def get_custom_classes():
-    if 'custom_classes' not in st.session_state:
-        st.session_state.custom_classes = []
-    return st.session_state.custom_classes
+    # Custom classes are shared by every session and survive restarts.
+    return get_class_store().list_classes()
+
+def is_builtin_class(name):
+    return any(cls["name"] == name for cls in get_initial_classes())
 
 def add_custom_class(name, prompts):
-    custom_classes = get_custom_classes()
-    custom_classes.append({"name": name, "prompts": prompts})
-    st.session_state.custom_classes = custom_classes
+    # Built-in names are rejected by the caller: replacing one would drop the
+    # built-in prompts from the index but not from a rebuild.
+    store = get_class_store()
+    version = store.version
+    prompts = clean_prompts(prompts)
+    store.add_class(name, prompts)
+    get_prompt_class_index().apply(name, prompts, version, version + 1)
     st.session_state.new_class_added = True
 
-def search_videos(selected_prompts, selected_class_names):
-    results_by_prompt = {}
-    
-    for i, prompt in enumerate(selected_prompts):
-        try:
-            class_name = next((class_name for class_name in selected_class_names 
-                              for cls in get_initial_classes() + get_custom_classes() 
-                              if cls["name"] == class_name and prompt in cls["prompts"]), "Unknown")
-            
-            result = client.search.query(
-                index_id=INDEX_ID,
-                options=["visual", "audio"],
-                query_text=prompt,
-                group_by="video",
-                threshold="medium",
-                operator="or",
-                page_limit=5,
-                sort_option="score"
-            )
-            
-            print(f"Search response for prompt '{prompt}':")
-            print(f"  Total results: {result.page_info.total_results}")
-            print(f"  Index ID: {result.pool.index_id}")
-            print(f"  Total count in pool: {result.pool.total_count}")
-            
-            if result.data and len(result.data) > 0:
-                print(f"  First result type: {type(result.data[0])}")
-                if isinstance(result.data[0], GroupByVideoSearchData) and result.data[0].clips:
-                    clip = result.data[0].clips[0]
-                    print(f"  Sample clip data: score={clip.score}, start={clip.start}, end={clip.end}")
-                    print(f"  Confidence type: {type(clip.confidence)}")
-                    print(f"  Confidence value: {clip.confidence}")
-            
-            results_by_prompt[prompt] = {
-                "class_name": class_name,
-                "result": result
-            }
-        except Exception as e:
-            st.error(f"API Error for prompt '{prompt}': {str(e)}")
-            print(f"Exception details: {type(e).__name__}: {str(e)}")
+@st.cache_resource
+def get_prompt_class_index():
+    return PromptClassIndex()
+
+def get_class_index():
+    # Rebuilt only when the class store changed without going through
+    # add_custom_class in this process (another process, or a restart).
+    # Reading the store version costs a SQLite query, so main calls this
+    # once per script run and passes the index along.
+    index = get_prompt_class_index()
+    version = get_class_store().version
+    if index.version != version:
+        index.rebuild(get_initial_classes() + get_custom_classes(), version)
+    return index
+
+def get_classes_for_prompt(class_index, prompt, selected_class_names):
+    return class_index.classes_for(prompt, selected_class_names) or ["Unknown"]
+
+def get_class_for_prompt(class_index, prompt, selected_class_names):
+    return get_classes_for_prompt(class_index, prompt, selected_class_names)[0]
+
+def iter_query_results(selected_prompts, selected_class_names, class_index, batched=False):
+    # Yields (query_text, prompts, result, error) for every query sent.
+    if not batched:
+        for prompt, result, error in search_engine.iter_search(selected_prompts):
+            yield prompt, [prompt], result, error
+        return
     
-    return results_by_prompt
+    prompts_by_class = {}
+    for prompt in dict.fromkeys(selected_prompts):
+        prompts_by_class.setdefault(get_class_for_prompt(class_index, prompt, selected_class_names), []).append(prompt)
+    yield from search_engine.iter_search_batched(prompts_by_class.values(), batch_size=SEARCH_BATCH_SIZE)
+
+def iter_search_videos(selected_prompts, selected_class_names, class_index, batched=False):
+    # Yields (prompt, prompt_data, error) as each prompt search completes.
+    # A combined query's hits are reported for every prompt it covered, with
+    # prompt_data["query"] naming the query so they are rendered only once.
+    for query_text, prompts, result, error in iter_query_results(selected_prompts, selected_class_names, class_index, batched):
+        if error is not None:
+            print(f"Exception details: {type(error).__name__}: {str(error)}")
+            for prompt in prompts:
+                yield prompt, None, error
+            continue
+        
+        print(f"Search response for '{query_text}': {len(result.data or [])} results")
+        
+        approximate = search_engine.approximations.get(query_text)
+        stale = query_text in search_engine.stale
+        for prompt in prompts:
+            class_names = get_classes_for_prompt(class_index, prompt, selected_class_names)
+            yield prompt, {
+                "class_name": class_names[0],
+                "class_names": class_names,
+                "result": result,
+                "query": query_text,
+                "approximate": approximate,
+                "stale": stale
+            }, None
+
+def get_video_ids(result):
+    return list(dict.fromkeys(item.id for item in result.data))
+
+def get_pager(key, result):
+    pagers = st.session_state.setdefault("pagers", {})
+    pager = pagers.get(key)
+    if pager is None or pager.first_page is not result:
+        pager = pagers[key] = PagedResults(result, search_engine.next_page, max_items=MAX_RESULTS_PER_PROMPT)
+    return pager
+
+def get_display_items(result, limit=3):
+    # limit=None returns every item that has clips.
+    return [item for item in result.data if item.clips][:limit]
+
+@st.cache_resource
+def get_video_resolver():
+    return VideoResolver(
+        API_KEY,
+        INDEX_ID,
+        max_workers=int(os.getenv("VIDEO_URL_MAX_WORKERS", "16")),
+        timeout=float(os.getenv("VIDEO_URL_TIMEOUT", "10")),
+        max_retries=int(os.getenv("VIDEO_URL_MAX_RETRIES", "3")),
+        cache=TTLCache(
+            maxsize=int(os.getenv("VIDEO_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("VIDEO_CACHE_TTL", "21600")),
+            stale_ttl=float(os.getenv("VIDEO_CACHE_STALE_TTL", "86400"))
+        ),
+        cache_ttl=float(os.getenv("VIDEO_CACHE_TTL", "21600")),
+        scheduler=get_request_scheduler(),
+        metrics=get_metrics(),
+        breaker=get_video_breaker()
+    )
 
 def get_video_urls(video_ids):
-    base_url = f"https://api.twelvelabs.io/v1.3/indexes/{INDEX_ID}/videos/{{}}"
-    headers = {"x-api-key": API_KEY, "Content-Type": "application/json"}
+    stale = set()
+    with search_engine.metrics.timer("video.resolve"):
+        # Lookups land in the current search's metrics (which feed the process-wide ones).
+        records, errors = get_video_resolver().resolve(video_ids, stale=stale, metrics=search_engine.metrics)
     video_urls = {}
+    if stale:
+        st.caption(f"🕒 Stale: {len(stale)} video link(s) come from cached records while Twelve Labs is unavailable")
 
     for video_id in video_ids:
-        try:
-            response = requests.get(base_url.format(video_id), headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if 'hls' in data and 'video_url' in data['hls']:
-                video_urls[video_id] = data['hls']['video_url']
-            else:
-                st.warning(f"No video URL found for video ID: {video_id}")
-        except requests.exceptions.RequestException as e:
-            st.error(f"Failed to get data for video ID: {video_id}. Error: {str(e)}")
+        if video_id in errors:
+            st.error(f"Failed to get data for video ID: {video_id}. Error: {str(errors[video_id])}")
+            continue
+        video_url = hls_url(records.get(video_id))
+        if video_url:
+            video_urls[video_id] = video_url
+        else:
+            st.warning(f"No video URL found for video ID: {video_id}")
 
     return video_urls
 
+@st.cache_resource
+def get_prewarm_job():
+    engine = ConcurrentSearchEngine(
+        get_client(),
+        INDEX_ID,
+        max_workers=1,
+        timeout=float(os.getenv("SEARCH_TIMEOUT", "30")),
+        cache=get_search_cache(),
+        scheduler=get_request_scheduler(),
+        single_flight=get_single_flight(),
+        priority=PRIORITY_BACKGROUND,
+        metrics=get_metrics(),
+        breaker=get_search_breaker()
+    )
+    if os.getenv("PREWARM_CUSTOM_CLASSES", "true").lower() in ("1", "true", "yes"):
+        class_store = get_class_store()
+        classes = lambda: INITIAL_CLASSES + class_store.list_classes()
+    else:
+        classes = INITIAL_CLASSES
+    return PrewarmJob(
+        engine,
+        get_video_resolver(),
+        classes,
+        stagger=float(os.getenv("PREWARM_STAGGER_SECONDS", "1"))
+    )
+
+@st.cache_resource
+def get_scheduler():
+    # Streamlit re-executes this script on every interaction; build the
+    # scheduler once per process so jobs are not registered repeatedly.
+    from apscheduler.schedulers.background import BackgroundScheduler
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(keep_alive, 'interval', minutes=10)
+    prewarm_minutes = float(os.getenv("PREWARM_INTERVAL_MINUTES", "30"))
+    if prewarm_minutes > 0:
+        scheduler.add_job(
+            get_prewarm_job().run,
+            'interval',
+            minutes=prewarm_minutes,
+            next_run_time=datetime.now() + timedelta(seconds=float(os.getenv("PREWARM_START_DELAY_SECONDS", "30"))),
+            max_instances=1,
+            coalesce=True
+        )
+    scheduler.start()
+    atexit.register(lambda: scheduler.shutdown(wait=False))
+    return scheduler
+
+scheduler = get_scheduler()
+
+def render_prewarm_status():
+    status = get_prewarm_job().status()
+    st.sidebar.markdown("**Cache pre-warm**")
+    if status["running"]:
+        st.sidebar.caption("⏳ Warming built-in categories...")
+    if status["last_finished"] is None:
+        st.sidebar.caption("Not warmed yet.")
+        return
+    st.sidebar.caption(f"Last warmed: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status['last_finished']))} ({status['last_duration']:.0f}s)")
+    st.sidebar.caption(f"Coverage: {status['prompts_warmed']}/{status['prompts_total']} prompts ({status['coverage']:.0%}), {status['videos_warmed']} videos, {status['errors']} errors")
+
+def render_debug_panel():
+    if not st.sidebar.checkbox("🔧 Show latency breakdown", value=False):
+        return
+    
+    snapshot = st.session_state.get("last_search_metrics")
+    if snapshot:
+        st.sidebar.markdown("**Latest search**")
+        st.sidebar.table([
+            {
+                "stage": name,
+                "count": summary["count"],
+                "total ms": round(summary["sum"] * 1000, 1),
+                "p50 ms": round(summary["p50"] * 1000, 1),
+                "p95 ms": round(summary["p95"] * 1000, 1),
+                "p99 ms": round(summary["p99"] * 1000, 1)
+            }
+            for name, summary in sorted(snapshot["histograms"].items())
+        ])
+        if snapshot["counters"]:
+            st.sidebar.table([{"counter": name, "value": value} for name, value in sorted(snapshot["counters"].items())])
+    else:
+        st.sidebar.caption("Run a search to see its breakdown.")
+    
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    histograms = snapshot["histograms"]
+    if "app.rerun" in histograms:
+        st.sidebar.caption(
+            f"Script imports: {snapshot['gauges'].get('app.imports_seconds', 0) * 1000:.0f} ms · "
+            f"rerun p50/p99: {histograms['app.rerun']['p50'] * 1000:.0f}/{histograms['app.rerun']['p99'] * 1000:.0f} ms"
+        )
+    st.sidebar.download_button("Export metrics (Prometheus)", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+    st.sidebar.download_button("Export metrics (JSON)", metrics.to_json(), file_name="metrics.json", mime="application/json")
+
+@st.cache_resource
+def record_import_time():
+    # Module imports are only slow on the first run in a process; later reruns
+    # reuse them, so the time is recorded once rather than sampled per rerun.
+    get_metrics().set_gauge("app.imports_seconds", IMPORTS_FINISHED - SCRIPT_STARTED)
+    return True
+
+def record_startup_timings():
+    record_import_time()
+    get_metrics().observe("app.rerun", time.perf_counter() - SCRIPT_STARTED)
+
 def render_video(video_url, key):
     hls_player = f"""
     <script src="https://cdn.jsdelivr.net/npm/hls.js@latest"></script>
@@ -164,280 +694,294 @@ def render_video(video_url, key):
     """
     st.components.v1.html(hls_player, height=400)
 
+def render_video_card(video_id, video_url, key):
+    if not LAZY_VIDEO_PLAYER or st.session_state.get("active_player") == key:
+        with search_engine.metrics.timer("render.video"):
+            render_video(video_url, key)
+        return
+    
+    # Only the card the user opens gets a player, so the page holds at most
+    # one hls.js iframe instead of one per result.
+    thumbnail = hls_thumbnail(get_video_resolver().cached(video_id))
+    if thumbnail:
+        st.image(thumbnail)
+    if st.button("▶️ Play video", key=f"play-{key}"):
+        st.session_state.active_player = key
+        st.rerun()
 
-def main():
 
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    .stApp {
-        font-family: 'Inter', sans-serif;
-        background-color: #ffffff;
-    }
-    
-    .big-font {
-        font-size: 48px !important;
-        font-weight: 700;
-        color: #667eea;
-        text-align: center;
-        margin-bottom: 40px;
-        letter-spacing: -1px;
-    }
-    
-    .subheader {
-        font-size: 28px;
-        font-weight: 600;
-        color: #1a202c;
-        margin-top: 30px;
-        margin-bottom: 20px;
-        border-bottom: 3px solid #667eea;
-        padding-bottom: 10px;
-        display: inline-block;
-    }
-    
-    .category-header {
-        font-size: 24px;
-        font-weight: 600;
-        color: #2d3748;
-        background-color: #f7fafc;
-        padding: 20px 25px;
-        border-radius: 15px;
-        margin: 30px 0 20px 0;
-        border-left: 5px solid #667eea;
-        box-shadow: 0 4px 20px rgba(102, 126, 234, 0.1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .category-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 2px;
-        background-color: #667eea;
-    }
-    
-    .prompt-header {
-        font-size: 20px;
-        font-weight: 500;
-        color: #2d3748;
-        background-color: #f0fff4;
-        padding: 15px 20px;
-        border-radius: 12px;
-        margin: 25px 0 15px 0;
-        border-left: 4px solid #38a169;
-        box-shadow: 0 2px 10px rgba(56, 161, 105, 0.1);
-        position: relative;
-    }
-    
-    .prompt-header::before {
-        content: '🎯';
-        position: absolute;
-        right: 20px;
-        top: 50%;
-        transform: translateY(-50%);
-        font-size: 18px;
-    }
-    
-    /* Multiselect styling */
-    .stMultiSelect > label {
-        color: #1a202c !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        animation: pulse 2s infinite;
-    }
-    
-    .stMultiSelect > div > div {
-        border-radius: 12px;
-        border: 2px solid #e2e8f0;
-        transition: all 0.3s ease;
-        background-color: #ffffff !important;
-    }
-    
-    .stMultiSelect > div > div:focus-within {
-        border-color: #667eea;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-    }
-    
-    .stMultiSelect [data-baseweb="select"] {
-        color: #1a202c !important;
-    }
-    
-    .stMultiSelect [data-baseweb="select"] > div {
-        color: #1a202c !important;
-        background-color: #ffffff !important;
-    }
-    
-    /* Text input styling */
-    .stTextInput > label {
-        color: #1a202c !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        animation: pulse 2s infinite;
-    }
-    
-    .stTextInput > div > div > input {
-        color: #1a202c !important;
-        background-color: #ffffff !important;
-    }
+def render_clip_meta(i, clip):
+    confidence_class = "confidence-high" if clip.confidence == "high" else "confidence-medium" if clip.confidence == "medium" else "confidence-low"
     
-    /* Pulse animation */
-    @keyframes pulse {
-        0% {
-            opacity: 1;
-        }
-        50% {
-            opacity: 0.7;
-            transform: scale(1.02);
-        }
-        100% {
-            opacity: 1;
-        }
-    }
+    # Convert seconds to minutes:seconds format
+    start_min, start_sec = divmod(int(float(clip.start)), 60)
+    end_min, end_sec = divmod(int(float(clip.end)), 60)
+    start_time = f"{start_min}:{start_sec:02d}"
+    end_time = f"{end_min}:{end_sec:02d}"
     
-    .stButton>button {
-        width: 100%;
-        background-color: #667eea;
-        color: white;
-        border: none;
-        border-radius: 12px;
-        padding: 15px 30px;
-        font-weight: 600;
-        font-size: 16px;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-    }
-    
-    .stButton>button:hover {
-        background-color: #5a67d8;
-        transform: translateY(-2px);
-        box-shadow: 0 6px 25px rgba(102, 126, 234, 0.4);
-    }
+    st.markdown(f"""
+    <div class="video-meta">
+        <strong>🎬 Clip {i+1}:</strong> {start_time} - {end_time} | 
+        <strong>Score:</strong> {float(clip.score):.1f} | 
+        <strong>Confidence:</strong> <span class="{confidence_class}">{clip.confidence}</span>
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_video_body(video_id, clips, video_urls, key):
+    st.markdown('<div class="video-card">', unsafe_allow_html=True)
     
-    .video-card {
-        background-color: #ffffff;
-        border-radius: 20px;
-        padding: 25px;
-        margin-bottom: 20px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.08);
-        border: 1px solid rgba(102, 126, 234, 0.1);
-        position: relative;
-        overflow: hidden;
-    }
+    for i, clip in enumerate(clips[:3]):
+        render_clip_meta(i, clip)
     
-    .video-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 3px;
-        background-color: #667eea;
-    }
+    if video_id in video_urls:
+        render_video_card(video_id, video_urls[video_id], key)
+    else:
+        st.warning("⚠️ Video URL not available. Unable to render video.")
     
-    .video-meta {
-        font-size: 15px;
-        color: #4a5568;
-        background-color: #f7fafc;
-        padding: 12px 16px;
-        border-radius: 10px;
-        margin: 8px 0;
-        border-left: 3px solid #e2e8f0;
-        font-weight: 500;
-    }
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def render_prompt_results(class_name, prompt, items, video_urls):
+    video_count = 0
+    for item in items:
+        with st.expander(f"🎬 Video {video_count+1}: {item.id}", expanded=(video_count == 0)):
+            render_video_body(item.id, item.clips, video_urls, f"{class_name}-{prompt}-{video_count}")
+        video_count += 1
+        
+    if video_count == 0:
+        st.info(f"ℹ️ No videos found for prompt: {prompt}")
+
+def render_merged_results(class_name, merged_videos, video_urls):
+    for video_count, video in enumerate(merged_videos):
+        with st.expander(f"🎬 Video {video_count+1}: {video.id}", expanded=(video_count == 0)):
+            score_label = f"{video.score:.1f}" if MERGE_FUSION == "max" else f"{video.score:.4f} (RRF)"
+            st.caption(f"Matched {len(video.prompts)} prompt(s): {', '.join(video.prompts)} • Fused score: {score_label}")
+            render_video_body(video.id, video.clips, video_urls, f"{class_name}-merged-{video_count}")
     
-    .confidence-high {
-        color: #38a169;
-        font-weight: 700;
-        background-color: rgba(56, 161, 105, 0.1);
-        padding: 4px 8px;
-        border-radius: 6px;
-    }
+    if not merged_videos:
+        st.info(f"ℹ️ No videos found for class: {class_name}")
+
+def layout_sections(selected_prompts, selected_class_names, class_index, merged, batched=False):
+    # Lay out every class and prompt section up front so each one can be
+    # filled in as soon as its searches come back. Sections are keyed by
+    # (class_name, prompt); in merged and batched mode a class is a single
+    # section (class_name, None) covering all of its prompts. A prompt shared
+    # by several selected classes gets a section under each of them.
+    class_sections = {}
+    slots = {}
+    members = {}
+    for prompt in dict.fromkeys(selected_prompts):
+        for class_name in get_classes_for_prompt(class_index, prompt, selected_class_names):
+            if class_name not in class_sections:
+                class_sections[class_name] = st.container()
+                class_sections[class_name].markdown(f'<div class="category-header"> {class_name}</div>', unsafe_allow_html=True)
+            section = (class_name, None if merged or batched else prompt)
+            members.setdefault(section, []).append(prompt)
+            if section not in slots:
+                slots[section] = class_sections[class_name].empty()
+                with slots[section].container():
+                    if section[1] is not None:
+                        st.markdown(f'<div class="prompt-header">Results for: "{prompt}"</div>', unsafe_allow_html=True)
+                    st.caption("⏳ Searching...")
+    return slots, members
+
+def render_prompt_section(class_name, prompt, prompt_data, error):
+    st.markdown(f'<div class="prompt-header">Results for: "{prompt}"</div>', unsafe_allow_html=True)
+    if error is not None:
+        st.error(f"API Error for prompt '{prompt}': {str(error)}")
+        return set()
     
-    .confidence-medium {
-        color: #d69e2e;
-        font-weight: 700;
-        background-color: rgba(214, 158, 46, 0.1);
-        padding: 4px 8px;
-        border-radius: 6px;
-    }
+    result = prompt_data["result"]
+    if prompt_data.get("approximate"):
+        similar_prompt, similarity = prompt_data["approximate"]
+        st.caption(f"≈ Approximate: reusing cached results for \"{similar_prompt}\" ({similarity:.0%} similar)")
+    if prompt_data.get("stale"):
+        st.caption("🕒 Stale: Twelve Labs is unavailable, showing cached results from an earlier search")
     
-    .confidence-low {
-        color: #e53e3e;
-        font-weight: 700;
-        background-color: rgba(229, 62, 62, 0.1);
-        padding: 4px 8px;
-        border-radius: 6px;
-    }
+    # Later pages are only fetched once "Load more" has been clicked.
+    pager = get_pager(prompt_data.get("query", prompt), result)
+    shown = st.session_state.setdefault("shown_counts", {}).get(prompt, RESULTS_PER_PAGE)
+    try:
+        items = pager.items(shown, fetch=shown > RESULTS_PER_PAGE)
+    except Exception as e:
+        st.error(f"API Error loading more results for '{prompt}': {str(e)}")
+        items = pager.items(shown, fetch=False)
     
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 30px;
-        background-color: #f7fafc;
-        padding: 10px 20px;
-        border-radius: 15px;
-        margin-bottom: 30px;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.05);
-    }
+    video_urls = get_video_urls([item.id for item in items])
+    with search_engine.metrics.timer("render.section"):
+        render_prompt_results(class_name, prompt, items, video_urls)
     
-    .stTabs [data-baseweb="tab"] {
-        height: 60px;
-        background: transparent;
-        border-radius: 12px;
-        padding: 15px 25px;
-        font-weight: 600;
-        font-size: 16px;
-        color: #4a5568;
-        transition: all 0.3s ease;
-    }
+    if pager.has_more(len(items)):
+        if st.button("⬇️ Load more results", key=f"more-{class_name}-{prompt}"):
+            st.session_state.shown_counts[prompt] = len(items) + RESULTS_PER_PAGE
+            st.rerun()
+    return set(get_video_ids(result))
+
+def render_class_section(class_name, prompts, outcomes):
+    video_ids = set()
+    prompt_results = []
+    for prompt, prompt_data, error in query_outcomes(prompts, outcomes):
+        if error is not None:
+            st.error(f"API Error for prompt '{prompt}': {str(error)}")
+            continue
+        if prompt_data.get("approximate"):
+            similar_prompt, similarity = prompt_data["approximate"]
+            st.caption(f"≈ \"{prompt}\" reuses cached results for \"{similar_prompt}\" ({similarity:.0%} similar)")
+        if prompt_data.get("stale"):
+            st.caption(f"🕒 Stale: \"{prompt}\" shows cached results while Twelve Labs is unavailable")
+        result = prompt_data["result"]
+        video_ids.update(get_video_ids(result))
+        prompt_results.append((prompt, get_display_items(result, limit=None)))
     
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {
-        background-color: #667eea;
-        color: white;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-    }
+    # Keep roughly the per-prompt page size, minus the duplicates.
+    with search_engine.metrics.timer("group.merge"):
+        merged_videos = merge_videos(prompt_results, fusion=MERGE_FUSION)[:3 * len(prompts)]
+    video_urls = get_video_urls([video.id for video in merged_videos])
+    with search_engine.metrics.timer("render.section"):
+        render_merged_results(class_name, merged_videos, video_urls)
+    return video_ids
+
+def query_outcomes(prompts, outcomes):
+    # One (query, prompt_data, error) per query that was sent: prompts
+    # answered by the same combined query share its hits, which cannot be
+    # attributed to any one of them.
+    seen = set()
+    for prompt in prompts:
+        prompt_data, error = outcomes[prompt]
+        query = prompt_data.get("query", prompt) if prompt_data is not None else prompt
+        if query not in seen:
+            seen.add(query)
+            yield query, prompt_data, error
+
+def render_query_sections(class_name, prompts, outcomes):
+    # Batched mode: one section per query sent, labelled with the query.
+    video_ids = set()
+    for query, prompt_data, error in query_outcomes(prompts, outcomes):
+        video_ids.update(render_prompt_section(class_name, query, prompt_data, error))
+    return video_ids
+
+def render_section(section, prompts, outcomes, merged=False):
+    class_name, prompt = section
+    if prompt is None:
+        if merged:
+            return render_class_section(class_name, prompts, outcomes)
+        return render_query_sections(class_name, prompts, outcomes)
+    prompt_data, error = outcomes[prompt]
+    return render_prompt_section(class_name, prompt, prompt_data, error)
+
+def render_search_summary(summary, video_ids, prompt_count):
+    unavailable = [
+        name for name, breaker in (("search", get_search_breaker()), ("video lookup", get_video_breaker()))
+        if breaker.state != CLOSED
+    ]
+    with summary.container():
+        if unavailable:
+            st.warning(f"🕒 Twelve Labs {' and '.join(unavailable)} is unavailable; cached results are shown where available and live searches resume once it recovers.")
+        if not video_ids:
+            st.warning(" No videos found matching your search criteria.")
+            return
+        st.success(f" Found {len(video_ids)} unique videos across {prompt_count} search prompts")
+        cache_stats = get_search_cache().stats()
+        scheduler_stats = get_request_scheduler().stats()
+        st.caption(
+            f"Search cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate) • "
+            f"API queue depth: {scheduler_stats['queue_depth']} (peak {scheduler_stats['max_queue_depth']}), "
+            f"rate {scheduler_stats['rate']:.1f}/s, {scheduler_stats['throttled']} throttled"
+        )
+
+def render_export_button(last_search):
+    # Exports the clips already on screen; the CLI (python -m olympics.cli export)
+    # covers large batches without the UI.
+    formats = ["ndjson", "parquet"] if parquet_available() else ["ndjson"]
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Export format", formats, key="export_format", label_visibility="collapsed")
+    buffer = io.BytesIO()
+    export_outcomes(last_search["outcomes"], buffer, fmt)
+    col2.download_button(
+        "📥 Export results",
+        buffer.getvalue(),
+        file_name=f"olympics-results.{fmt}",
+        mime="application/x-ndjson" if fmt == "ndjson" else "application/octet-stream"
+    )
+
+def reusable_outcomes(last_search, selected_prompts, selected_class_names, class_index):
+    # Successful outcomes of the previous search that the new selection
+    # still needs, with their class attribution updated to the new selection.
+    if not INCREMENTAL_SEARCH or not last_search:
+        return {}
+    if time.time() - last_search.get("searched_at", 0) > float(os.getenv("SEARCH_CACHE_TTL", "3600")):
+        return {}
+    reused = {}
+    for prompt in dict.fromkeys(selected_prompts):
+        prompt_data, error = last_search["outcomes"].get(prompt, (None, None))
+        if prompt_data is None or error is not None or prompt_data.get("stale"):
+            continue
+        if prompt_data.get("query", prompt) != prompt:
+            # A combined query may cover prompts that are no longer selected.
+            continue
+        class_names = get_classes_for_prompt(class_index, prompt, selected_class_names)
+        reused[prompt] = (dict(prompt_data, class_name=class_names[0], class_names=class_names), None)
+    return reused
+
+def run_search(selected_prompts, selected_class_names, class_index, merged=False, batched=False, reused=None):
+    summary = st.empty()
+    slots, members = layout_sections(selected_prompts, selected_class_names, class_index, merged, batched)
+    sections_of = {}
+    for section, prompts in members.items():
+        for prompt in prompts:
+            sections_of.setdefault(prompt, []).append(section)
     
-    .custom-container {
-        background-color: #ffffff;
-        border-radius: 20px;
-        padding: 30px;
-        margin: 20px 0;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.08);
-        border: 1px solid rgba(102, 126, 234, 0.1);
-    }
+    # Collect this search's timings separately for the debug panel; they
+    # still feed the process-wide metrics through the parent link.
+    search_metrics = Metrics(parent=get_metrics())
+    search_engine.metrics = search_metrics
+    outcomes = dict(reused or {})
+    new_prompts = [prompt for prompt in dict.fromkeys(selected_prompts) if prompt not in outcomes]
+    search_metrics.increment("search.reused_prompts", len(outcomes))
+    video_ids = set()
+    try:
+        # Sections whose prompts were all kept from the last search render straight away.
+        for section, prompts in members.items():
+            if all(prompt in outcomes for prompt in prompts):
+                with slots[section].container():
+                    video_ids.update(render_section(section, prompts, outcomes, merged))
+        
+        with st.spinner(" Searching videos..."), search_metrics.timer("search.total"):
+            for prompt, prompt_data, error in iter_search_videos(new_prompts, selected_class_names, class_index, batched):
+                outcomes[prompt] = (prompt_data, error)
+                for section in sections_of[prompt]:
+                    if all(member in outcomes for member in members[section]):
+                        with slots[section].container():
+                            video_ids.update(render_section(section, members[section], outcomes, merged))
+    finally:
+        search_engine.metrics = get_metrics()
+        st.session_state.last_search_metrics = search_metrics.snapshot()
     
-    .footer-style {
-        background-color: #667eea;
-        color: white;
-        text-align: center;
-        padding: 30px;
-        border-radius: 20px;
-        margin-top: 50px;
-        box-shadow: 0 8px 32px rgba(102, 126, 234, 0.2);
-    }
+    render_search_summary(summary, video_ids, len(selected_prompts))
+    return {prompt: outcomes[prompt] for prompt in dict.fromkeys(selected_prompts) if prompt in outcomes}
+
+def show_search(last_search, class_index):
+    merged = last_search.get("merged", False)
+    summary = st.empty()
+    slots, members = layout_sections(last_search["prompts"], last_search["classes"], class_index, merged, last_search.get("batched", False))
     
-    .footer-style a {
-        color: #ffffff;
-        text-decoration: none;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        padding: 5px 10px;
-        border-radius: 8px;
-    }
+    video_ids = set()
+    for section, prompts in members.items():
+        if all(prompt in last_search["outcomes"] for prompt in prompts):
+            with slots[section].container():
+                video_ids.update(render_section(section, prompts, last_search["outcomes"], merged))
     
-    .footer-style a:hover {
-        background-color: rgba(255, 255, 255, 0.2);
-        transform: translateY(-1px);
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    render_search_summary(summary, video_ids, len(last_search["prompts"]))
+
+def main():
 
     st.markdown('<p class="big-font">🏅 Olympics Classification</p>', unsafe_allow_html=True)
     st.markdown('<p style="text-align: center; font-size: 18px; color: #4a5568; margin-bottom: 40px;">Powered by Twelve Labs AI • Discover Olympic moments with intelligent video search</p>', unsafe_allow_html=True)
 
+    render_prewarm_status()
+    render_debug_panel()
+
     CLASSES = get_initial_classes() + get_custom_classes()
+    class_index = get_class_index()
     
     tab1, tab2 = st.tabs([" Search Videos", "➕ Add Custom Class"])
     
@@ -451,94 +995,45 @@ def main():
             class_names,
             help="Select one or more categories to search for relevant video content"
         )
+        merge_results = st.checkbox(
+            "Merge duplicate videos across a category's prompts",
+            value=False,
+            help="Show each video once per category, ranked by its fused score across prompts"
+        )
+        batch_queries = st.checkbox(
+            "Batch each category's prompts into combined queries",
+            value=SEARCH_BATCH_DEFAULT,
+            help="Sends a category's prompts as one combined query text, so results are shown per query rather than per prompt; queries with no hits are split and retried"
+        )
         
         if st.button(" Search Videos", key="search_button"):
             if selected_classes:
-                with st.spinner(" Searching videos..."):
-                    selected_prompts = []
-                    for cls in CLASSES:
-                        if cls["name"] in selected_classes:
-                            selected_prompts.extend(cls["prompts"])
-                    
-                    results_by_prompt = search_videos(selected_prompts, selected_classes)
-                    
-                    video_ids = set()
-                    for prompt_data in results_by_prompt.values():
-                        result = prompt_data["result"]
-                        for item in result.data:
-                            if isinstance(item, GroupByVideoSearchData):
-                                video_ids.add(item.id)
-                            else:
-                                video_ids.add(item.video_id)
-                    
-                    video_urls = get_video_urls(list(video_ids))
-                    
-                    if not video_ids:
-                        st.warning(" No videos found matching your search criteria.")
-                    else:
-                        st.success(f" Found {len(video_ids)} unique videos across {len(selected_prompts)} search prompts")
-                        
-                        results_by_class = {}
-                        for prompt, prompt_data in results_by_prompt.items():
-                            class_name = prompt_data["class_name"]
-                            if class_name not in results_by_class:
-                                results_by_class[class_name] = []
-                            results_by_class[class_name].append({
-                                "prompt": prompt,
-                                "result": prompt_data["result"]
-                            })
-                        
-                        for class_name, class_results in results_by_class.items():
-                            st.markdown(f'<div class="category-header"> {class_name}</div>', unsafe_allow_html=True)
-                            
-                            for prompt_result in class_results:
-                                prompt = prompt_result["prompt"]
-                                result = prompt_result["result"]
-                                
-                                st.markdown(f'<div class="prompt-header">Results for: "{prompt}"</div>', unsafe_allow_html=True)
-                                
-                                video_count = 0
-                                for item in result.data:
-                                    if isinstance(item, GroupByVideoSearchData):
-                                        video_id = item.id
-                                        if not item.clips:
-                                            continue
-                                            
-                                        with st.expander(f"🎬 Video {video_count+1}: {video_id}", expanded=(video_count == 0)):
-                                            st.markdown('<div class="video-card">', unsafe_allow_html=True)
-                                            
-                                            for i, clip in enumerate(item.clips[:3]):
-                                                confidence_class = "confidence-high" if clip.confidence == "high" else "confidence-medium" if clip.confidence == "medium" else "confidence-low"
-                                                
-                                                # Convert seconds to minutes:seconds format
-                                                start_min, start_sec = divmod(int(float(clip.start)), 60)
-                                                end_min, end_sec = divmod(int(float(clip.end)), 60)
-                                                start_time = f"{start_min}:{start_sec:02d}"
-                                                end_time = f"{end_min}:{end_sec:02d}"
-                                                
-                                                st.markdown(f"""
-                                                <div class="video-meta">
-                                                    <strong>🎬 Clip {i+1}:</strong> {start_time} - {end_time} | 
-                                                    <strong>Score:</strong> {float(clip.score):.1f} | 
-                                                    <strong>Confidence:</strong> <span class="{confidence_class}">{clip.confidence}</span>
-                                                </div>
-                                                """, unsafe_allow_html=True)
-                                            
-                                            if video_id in video_urls:
-                                                render_video(video_urls[video_id], f"{class_name}-{prompt}-{video_count}")
-                                            else:
-                                                st.warning("⚠️ Video URL not available. Unable to render video.")
-                                            
-                                            st.markdown('</div>', unsafe_allow_html=True)
-                                        
-                                        video_count += 1
-                                        if video_count >= 3:
-                                            break
-                                    
-                                if video_count == 0:
-                                    st.info(f"ℹ️ No videos found for prompt: {prompt}")
+                selected_prompts = []
+                for cls in CLASSES:
+                    if cls["name"] in selected_classes:
+                        selected_prompts.extend(cls["prompts"])
+                
+                st.session_state.active_player = None
+                st.session_state.shown_counts = {}
+                # Only prompts that were not part of the last search are queried again.
+                reused = reusable_outcomes(st.session_state.get("last_search"), selected_prompts, selected_classes, class_index)
+                outcomes = run_search(selected_prompts, selected_classes, class_index, merged=merge_results, batched=batch_queries, reused=reused)
+                st.session_state.last_search = {
+                    "prompts": selected_prompts,
+                    "classes": selected_classes,
+                    "merged": merge_results,
+                    "batched": batch_queries,
+                    "outcomes": outcomes,
+                    "searched_at": time.time() if not reused else st.session_state.last_search.get("searched_at", time.time())
+                }
             else:
                 st.warning("⚠️ Please select at least one class.")
+        elif st.session_state.get("last_search"):
+            # Reruns (e.g. a player being opened) redraw the last search from session state.
+            show_search(st.session_state.last_search, class_index)
+        
+        if st.session_state.get("last_search"):
+            render_export_button(st.session_state.last_search)
         
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -550,7 +1045,9 @@ def main():
         custom_class_prompts = st.text_input("📝 Enter custom class prompts (comma-separated)", placeholder="e.g., skiing, snowboarding, ice skating")
         
         if st.button("➕ Add Custom Class"):
-            if custom_class_name and custom_class_prompts:
+            if custom_class_name and is_builtin_class(custom_class_name):
+                st.warning(f"⚠️ '{custom_class_name}' is a built-in class; please choose another name.")
+            elif custom_class_name and custom_class_prompts:
                 prompts_list = [p.strip() for p in custom_class_prompts.split(',')]
                 add_custom_class(custom_class_name, prompts_list)
                 st.success(f"✅ Custom class '{custom_class_name}' added successfully!")
@@ -565,6 +1062,8 @@ def main():
         st.rerun()
 
 if __name__ == "__main__":
+    # st.rerun() ends the script with an exception that is not an Exception
+    # subclass, so the timing is recorded in finally to cover those runs too.
     try:
         main()
         
@@ -593,6 +1092,5 @@ if __name__ == "__main__":
         
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
-    
-    import atexit
-    atexit.register(lambda: scheduler.shutdown())
+    finally:
+        record_startup_timings()
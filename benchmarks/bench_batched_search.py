@@ -0,0 +1,49 @@
+import argparse
+import time
+
+from benchmarks.stub_backend import StubTwelveLabs
+from olympics.classes import INITIAL_CLASSES
+from olympics.search_engine import ConcurrentSearchEngine
+
+
+def run_per_prompt(classes, latency, max_workers, empty_rate=0.0):
+    client = StubTwelveLabs(latency=latency, empty_rate=empty_rate)
+    engine = ConcurrentSearchEngine(client, "bench-index", max_workers=max_workers)
+    prompts = [prompt for cls in classes for prompt in cls["prompts"]]
+    start = time.perf_counter()
+    list(engine.iter_search(prompts))
+    return client.call_count, time.perf_counter() - start, 0
+
+
+def run_batched(classes, latency, max_workers, batch_size, empty_rate=0.0):
+    client = StubTwelveLabs(latency=latency, empty_rate=empty_rate)
+    engine = ConcurrentSearchEngine(client, "bench-index", max_workers=max_workers)
+    start = time.perf_counter()
+    results = list(engine.iter_search_batched([cls["prompts"] for cls in classes], batch_size=batch_size))
+    # Queries answered only after their batch was split at least once.
+    split = sum(1 for query_text, prompts, result, error in results if len(prompts) < batch_size)
+    return client.call_count, time.perf_counter() - start, split
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-prompt and class-batched search against a stub client")
+    parser.add_argument("--classes", type=int, default=len(INITIAL_CLASSES), help="number of built-in classes to search")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub API latency in seconds")
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--empty-rate", type=float, default=0.3,
+                        help="share of query texts that find nothing, to exercise split-and-retry")
+    args = parser.parse_args()
+
+    classes = INITIAL_CLASSES[:args.classes]
+    print(f"{len(classes)} classes, {args.latency * 1000:.0f} ms latency, {args.max_workers} workers")
+    print(f"{'mode':<12}{'empty':>7}{'API calls':>11}{'latency (s)':>14}{'split queries':>15}")
+    for empty_rate in dict.fromkeys((0.0, args.empty_rate)):
+        calls, elapsed, split = run_per_prompt(classes, args.latency, args.max_workers, empty_rate)
+        print(f"{'per-prompt':<12}{empty_rate:>7.0%}{calls:>11}{elapsed:>14.3f}{split:>15}")
+        calls, elapsed, split = run_batched(classes, args.latency, args.max_workers, args.batch_size, empty_rate)
+        print(f"{'batched':<12}{empty_rate:>7.0%}{calls:>11}{elapsed:>14.3f}{split:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import sys
+import threading
+import time
+
+from benchmarks.stub_backend import StubTwelveLabs
+from olympics.cache import TTLCache, TieredCache
+from olympics.classes import INITIAL_CLASSES
+from olympics.search_engine import ConcurrentSearchEngine
+from olympics.singleflight import SingleFlight
+
+
+def simulate_sessions(sessions, prompts, latency, coalesce=True):
+    # Each session gets its own engine (as each Streamlit script run does)
+    # but shares the process-wide cache and single-flight group.
+    client = StubTwelveLabs(latency=latency)
+    cache = TieredCache(TTLCache(maxsize=1024, ttl=3600))
+    single_flight = SingleFlight() if coalesce else None
+    barrier = threading.Barrier(sessions)
+    results = [None] * sessions
+
+    def session(n):
+        engine = ConcurrentSearchEngine(client, "bench-index", max_workers=8, cache=cache, single_flight=single_flight)
+        barrier.wait()
+        results[n], _ = engine.search(prompts)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return client.call_count, time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions searching the same class")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub API latency in seconds")
+    parser.add_argument("--class-name", default="TeamSports")
+    args = parser.parse_args()
+
+    prompts = next(cls["prompts"] for cls in INITIAL_CLASSES if cls["name"] == args.class_name)
+    print(f"{args.sessions} sessions searching {args.class_name} ({len(prompts)} prompts)")
+    print(f"{'mode':<14}{'API calls':>10}{'latency (s)':>14}")
+    for coalesce in (False, True):
+        calls, elapsed, results = simulate_sessions(args.sessions, prompts, args.latency, coalesce)
+        print(f"{'single-flight' if coalesce else 'independent':<14}{calls:>10}{elapsed:>14.3f}")
+
+    if calls != len(prompts):
+        print(f"FAIL: expected {len(prompts)} API calls with single-flight, got {calls}")
+        return 1
+    if any(list(result) != prompts for result in results):
+        print("FAIL: a session did not receive results for every prompt")
+        return 1
+    print("OK: every session was served by one call per prompt")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
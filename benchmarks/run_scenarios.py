@@ -0,0 +1,168 @@
+import argparse
+import json
+import sys
+import threading
+import time
+
+from benchmarks.stub_backend import StubTwelveLabs, StubVideoSession, load_recording
+from olympics.cache import TTLCache, TieredCache
+from olympics.classes import INITIAL_CLASSES
+from olympics.metrics import Metrics
+from olympics.rate_limit import RequestScheduler
+from olympics.search_engine import ConcurrentSearchEngine
+from olympics.singleflight import SingleFlight
+from olympics.video_resolver import VideoResolver
+
+
+SCENARIOS = ("1-class", "8-class", "n-class", "sessions")
+
+
+def synthetic_classes(count):
+    classes = list(INITIAL_CLASSES)
+    for n in range(len(classes), count):
+        classes.append({"name": f"SyntheticClass{n}", "prompts": [f"synthetic prompt {n}-{i}" for i in range(5)]})
+    return classes[:count]
+
+
+class Backend:
+    # The process-wide pieces the app shares between sessions, wired to stubs.
+
+    def __init__(self, args):
+        recording = load_recording(args.recording) if args.recording else {}
+        self.client = StubTwelveLabs(
+            latency=args.search_latency, jitter=args.jitter, throttle_rate=args.throttle_rate,
+            error_rate=args.error_rate, seed=args.seed, recorded=recording.get("search")
+        )
+        self.session = StubVideoSession(
+            latency=args.video_latency, jitter=args.jitter, throttle_rate=args.throttle_rate,
+            error_rate=args.error_rate, seed=args.seed, recorded=recording.get("videos")
+        )
+        self.metrics = Metrics()
+        self.cache = TieredCache(TTLCache(maxsize=4096, ttl=3600))
+        self.scheduler = RequestScheduler(rate=args.rate_limit, burst=args.rate_limit, backoff=0.05)
+        self.single_flight = SingleFlight()
+        self.resolver = VideoResolver(
+            "stub-key", "stub-index", session=self.session, max_workers=args.video_workers,
+            timeout=5, backoff=0.01, max_backoff=0.1, scheduler=self.scheduler, metrics=self.metrics
+        )
+        self.max_workers = args.search_workers
+
+    def engine(self, metrics):
+        return ConcurrentSearchEngine(
+            self.client, "stub-index", max_workers=self.max_workers, cache=self.cache,
+            scheduler=self.scheduler, single_flight=self.single_flight, metrics=metrics
+        )
+
+
+def run_search(backend, classes):
+    # Mirrors main(): search every prompt, then resolve the URLs of the
+    # videos each prompt would display, as results arrive.
+    metrics = Metrics(parent=backend.metrics)
+    engine = backend.engine(metrics)
+    prompts = [prompt for cls in classes for prompt in cls["prompts"]]
+    start = time.perf_counter()
+    first = None
+    errors = 0
+    for prompt, result, error in engine.iter_search(prompts):
+        if first is None:
+            first = time.perf_counter() - start
+            metrics.observe("pipeline.first_result", first)
+        if error is not None:
+            errors += 1
+            continue
+        display_ids = [item.id for item in result.data if item.clips][:3]
+        with metrics.timer("video.resolve"):
+            backend.resolver.resolve(display_ids)
+    metrics.observe("pipeline.total", time.perf_counter() - start)
+    return errors
+
+
+def run_scenario(args, scenario):
+    if scenario == "1-class":
+        classes, sessions = INITIAL_CLASSES[:1], 1
+    elif scenario == "8-class":
+        classes, sessions = INITIAL_CLASSES, 1
+    elif scenario == "n-class":
+        classes, sessions = synthetic_classes(args.classes), 1
+    else:
+        classes, sessions = INITIAL_CLASSES, args.sessions
+
+    backend = Backend(args)
+    runs = []
+    for run in range(args.runs):
+        calls_before = (backend.client.call_count, backend.session.call_count)
+        errors = []
+        barrier = threading.Barrier(sessions)
+
+        def session():
+            barrier.wait()
+            errors.append(run_search(backend, classes))
+
+        threads = [threading.Thread(target=session) for _ in range(sessions)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        runs.append({
+            "run": "cold" if run == 0 else f"warm {run}",
+            "wall_seconds": time.perf_counter() - start,
+            "search_calls": backend.client.call_count - calls_before[0],
+            "video_calls": backend.session.call_count - calls_before[1],
+            "prompt_errors": sum(errors),
+        })
+
+    backend.resolver.close()
+    return {
+        "scenario": scenario,
+        "classes": len(classes),
+        "prompts": sum(len(cls["prompts"]) for cls in classes),
+        "sessions": sessions,
+        "runs": runs,
+        "metrics": backend.metrics.snapshot(),
+    }
+
+
+def print_report(report):
+    print(f"\n== {report['scenario']}: {report['classes']} classes, {report['prompts']} prompts, {report['sessions']} session(s)")
+    print(f"{'run':<10}{'wall (s)':>10}{'search calls':>14}{'video calls':>13}{'errors':>8}")
+    for run in report["runs"]:
+        print(f"{run['run']:<10}{run['wall_seconds']:>10.3f}{run['search_calls']:>14}{run['video_calls']:>13}{run['prompt_errors']:>8}")
+    print(f"{'stage':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, summary in sorted(report["metrics"]["histograms"].items()):
+        print(f"{name:<24}{summary['count']:>7}{summary['p50'] * 1000:>10.1f}{summary['p95'] * 1000:>10.1f}{summary['p99'] * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run end-to-end search scenarios against the stub Twelve Labs backend")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--classes", type=int, default=32, help="class count for the n-class scenario")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions for the sessions scenario")
+    parser.add_argument("--runs", type=int, default=2, help="repeat each scenario; runs after the first hit warm caches")
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--video-latency", type=float, default=0.08)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=50.0, help="client-side requests per second")
+    parser.add_argument("--search-workers", type=int, default=8)
+    parser.add_argument("--video-workers", type=int, default=16)
+    parser.add_argument("--recording", help="JSON file of recorded search and video responses")
+    parser.add_argument("--seed", type=int, default=12)
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+    unknown = [scenario for scenario in args.scenarios if scenario not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    reports = [run_scenario(args, scenario) for scenario in args.scenarios]
+    for report in reports:
+        print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
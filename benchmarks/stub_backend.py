@@ -0,0 +1,180 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+
+def _stable_int(text):
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def make_clip(start, end, score, confidence):
+    return SimpleNamespace(start=start, end=end, score=score, confidence=confidence)
+
+
+def make_item(video_id, clips):
+    return SimpleNamespace(id=video_id, clips=[make_clip(**clip) if isinstance(clip, dict) else clip for clip in clips])
+
+
+def synthetic_items(query_text, hits=5, video_pool=200):
+    seed = _stable_int(query_text)
+    items = []
+    for rank in range(hits):
+        video_number = (seed + rank * 7919) % video_pool
+        start = float((seed + rank * 31) % 600)
+        score = 90.0 - rank * 5
+        items.append(make_item(f"video-{video_number:04d}", [
+            make_clip(start, start + 6.0, score, "high" if score >= 85 else "medium"),
+            make_clip(start + 20.0, start + 24.0, score - 10, "low"),
+        ]))
+    return items
+
+
+def make_result(query_text, index_id, hits=5, video_pool=200, items=None):
+    data = items if items is not None else synthetic_items(query_text, hits, video_pool)
+    return SimpleNamespace(
+        data=data,
+        page_info=SimpleNamespace(total_results=len(data), next_page_token=None),
+        pool=SimpleNamespace(index_id=index_id, total_count=video_pool),
+    )
+
+
+def synthetic_video_record(video_id):
+    seed = _stable_int(video_id)
+    return {
+        "_id": video_id,
+        "system_metadata": {"filename": f"{video_id}.mp4", "duration": 60.0 + seed % 540},
+        "hls": {
+            "video_url": f"https://stub.invalid/{video_id}/stream.m3u8",
+            "thumbnail_urls": [f"https://stub.invalid/{video_id}/thumbnail.jpg"],
+            "status": "COMPLETE",
+        },
+    }
+
+
+def load_recording(path):
+    # Recording format: {"search": {query_text: [{"id": ..., "clips": [{start, end, score, confidence}]}]},
+    #                    "videos": {video_id: <GET /indexes/{id}/videos/{id} JSON>}}
+    with open(path, encoding="utf-8") as f:
+        recording = json.load(f)
+    return {
+        "search": {
+            query: [make_item(item["id"], item.get("clips", [])) for item in items]
+            for query, items in recording.get("search", {}).items()
+        },
+        "videos": recording.get("videos", {}),
+    }
+
+
+class StubAPIError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(f"{status_code} {message}")
+        self.status_code = status_code
+
+
+class FaultModel:
+    # Latency with uniform jitter plus random 429/500 failures.
+
+    def __init__(self, latency=0.2, jitter=0.0, throttle_rate=0.0, error_rate=0.0, seed=None):
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.throttle_rate = float(throttle_rate)
+        self.error_rate = float(error_rate)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next(self):
+        # Returns (delay_seconds, status_code).
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 500
+        return delay, 200
+
+
+class StubSearch:
+    # empty_rate is the share of query texts (fixed per text) that find nothing.
+
+    def __init__(self, faults, hits=5, recorded=None, empty_rate=0.0):
+        self.faults = faults
+        self.hits = hits
+        self.recorded = recorded or {}
+        self.empty_rate = float(empty_rate)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def query(self, index_id, query_text, **params):
+        with self._lock:
+            self.calls.append(query_text)
+        delay, status = self.faults.next()
+        time.sleep(delay)
+        if status == 429:
+            raise StubAPIError(429, "Too Many Requests")
+        if status >= 500:
+            raise StubAPIError(status, "Internal Server Error")
+        items = self.recorded.get(query_text)
+        if items is None and _stable_int(query_text) % 1000 < self.empty_rate * 1000:
+            items = []
+        return make_result(query_text, index_id, hits=self.hits, items=items)
+
+
+class StubTwelveLabs:
+    # Stands in for twelvelabs.TwelveLabs: only search.query is used.
+
+    def __init__(self, latency=0.2, hits=5, jitter=0.0, throttle_rate=0.0, error_rate=0.0, seed=None,
+                 recorded=None, empty_rate=0.0):
+        faults = FaultModel(latency, jitter, throttle_rate, error_rate, seed)
+        self.search = StubSearch(faults, hits=hits, recorded=recorded, empty_rate=empty_rate)
+
+    @property
+    def call_count(self):
+        return len(self.search.calls)
+
+
+class StubResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.headers = {}
+        self._payload = payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self._payload
+
+
+class StubVideoSession:
+    # Stands in for the requests.Session used by VideoResolver, serving
+    # GET /v1.3/indexes/{index_id}/videos/{video_id}.
+
+    def __init__(self, latency=0.05, jitter=0.0, throttle_rate=0.0, error_rate=0.0, seed=None, recorded=None):
+        self.faults = FaultModel(latency, jitter, throttle_rate, error_rate, seed)
+        self.recorded = recorded or {}
+        self.headers = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, **kwargs):
+        video_id = url.rstrip("/").rsplit("/", 1)[-1]
+        with self._lock:
+            self.calls.append(video_id)
+        delay, status = self.faults.next()
+        time.sleep(delay)
+        if status != 200:
+            return StubResponse(status)
+        return StubResponse(200, self.recorded.get(video_id) or synthetic_video_record(video_id))
+
+    def close(self):
+        pass
+
+    @property
+    def call_count(self):
+        return len(self.calls)
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    # Thread-safe in-process cache with LRU eviction and per-entry expiry.
+    # Expired entries are kept for another stale_ttl seconds, readable only
+    # through get_stale (e.g. while the API is down).
+
+    def __init__(self, maxsize=1024, ttl=3600.0, clock=time.monotonic, stale_ttl=0.0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            now = self.clock()
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def get_stale(self, key, default=None):
+        # Like get, but also returns entries that expired less than stale_ttl ago.
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[1] + self.stale_ttl <= self.clock():
+                return default
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = self.clock() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteCache:
+    # On-disk tier so warm entries survive app restarts. Values are pickled;
+    # a connection is opened per call so any thread (or process) can use it.
+
+    def __init__(self, path, maxsize=10000, ttl=86400.0, stale_ttl=0.0):
+        self.path = path
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key, default=None):
+        return self.get_with_ttl(key, (default, None))[0]
+
+    def get_with_ttl(self, key, default=None):
+        # Returns (value, seconds until the entry expires), or default.
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return default
+            if row[1] <= now:
+                if row[1] + self.stale_ttl <= now:
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return default
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        try:
+            return pickle.loads(row[0]), row[1] - now
+        except Exception:
+            self.pop(key)
+            return default
+
+    def get_stale(self, key, default=None):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at + ? > ?",
+                (key, self.stale_ttl, time.time())
+            ).fetchone()
+        if row is None:
+            return default
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return default
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else float(ttl))
+        blob = sqlite3.Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, blob, expires_at, now)
+            )
+            conn.execute("DELETE FROM cache WHERE expires_at + ? <= ?", (self.stale_ttl, now))
+            conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,)
+            )
+
+    def pop(self, key, default=None):
+        value = self.get(key, _MISSING)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        return default if value is _MISSING else value
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    # Memory tier in front of an optional disk tier, with hit/miss counters.
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            try:
+                value, remaining = self.disk.get_with_ttl(key, (_MISSING, None))
+            except sqlite3.Error as e:
+                print(f"Disk cache read failed: {str(e)}")
+                value = _MISSING
+            if value is not _MISSING:
+                self._count("disk_hits")
+                # Promoted with what is left of the disk entry's lifetime, so
+                # it does not outlive the TTL it was stored with.
+                self.memory.set(key, value, remaining)
+                return value
+        self._count("misses")
+        return default
+
+    def get_stale(self, key, default=None):
+        value = self.memory.get_stale(key, _MISSING)
+        if value is _MISSING and self.disk is not None:
+            try:
+                value = self.disk.get_stale(key, _MISSING)
+            except sqlite3.Error as e:
+                print(f"Disk cache read failed: {str(e)}")
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, ttl)
+            except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError) as e:
+                print(f"Disk cache write failed: {str(e)}")
+
+    def pop(self, key, default=None):
+        value = self.memory.pop(key, _MISSING)
+        if self.disk is not None:
+            disk_value = self.disk.pop(key, _MISSING)
+            if value is _MISSING:
+                value = disk_value
+        return default if value is _MISSING else value
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        return stats
+
+
+def search_cache_key(index_id, prompt, search_params):
+    payload = json.dumps(
+        {"index_id": index_id, "prompt": prompt, "params": search_params},
+        sort_keys=True,
+        default=str
+    )
+    return "search:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
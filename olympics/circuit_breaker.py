@@ -0,0 +1,146 @@
+import threading
+import time
+
+from olympics.metrics import Metrics
+from olympics.rate_limit import is_rate_limited
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+def error_status(error):
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def is_outage(error):
+    # Server errors, timeouts and connection failures count against the
+    # provider; rate limiting and other client errors do not.
+    if is_rate_limited(error):
+        return False
+    status = error_status(error)
+    return status is None or status >= 500
+
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures, where a call slower
+    # than slow_call_seconds also counts as a failure. While open, calls are
+    # rejected with CircuitOpen. After reset_timeout one probe call is let
+    # through (half-open): success closes the circuit, failure reopens it.
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, slow_call_seconds=None,
+                 is_failure=is_outage, clock=time.monotonic, metrics=None):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.slow_call_seconds = float(slow_call_seconds) if slow_call_seconds else None
+        self.is_failure = is_failure
+        self.clock = clock
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def available(self):
+        # True when a call could go through now, without reserving the probe.
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    def retry_in(self):
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self.clock() - self._opened_at))
+
+    def allow(self):
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._state = HALF_OPEN
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+        self.metrics.increment(f"circuit.{self.name}.rejected")
+        return False
+
+    def record_success(self, elapsed=0.0):
+        if self.slow_call_seconds is not None and elapsed >= self.slow_call_seconds:
+            self.metrics.increment(f"circuit.{self.name}.slow_calls")
+            self.record_failure()
+            return
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == OPEN:
+                # Calls that were already in flight when the circuit opened.
+                return
+            reopen = self._state == HALF_OPEN
+            self._probing = False
+            if not reopen and self._failures < self.failure_threshold:
+                return
+            self._state = OPEN
+            self._opened_at = self.clock()
+            self._stats["opened"] += 1
+        self.metrics.increment(f"circuit.{self.name}.opened")
+        print(f"Circuit '{self.name}' opened; retrying in {self.reset_timeout:.0f}s")
+
+    def release(self):
+        # For a call that neither succeeded nor failed (e.g. a client error):
+        # a half-open probe slot is handed back without changing state.
+        with self._lock:
+            self._probing = False
+
+    def open_error(self):
+        return CircuitOpen(f"{self.name} is unavailable; retrying in {self.retry_in():.0f}s")
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise self.open_error()
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.release()
+            raise
+        self.record_success(time.perf_counter() - start)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["state"] = self._current_state()
+            stats["failures"] = self._failures
+        return stats
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+def clean_prompts(prompts):
+    # The prompt list add_class stores: empty entries and repeats dropped.
+    return list(dict.fromkeys(prompt for prompt in prompts if prompt))
+
+
+class ClassStore:
+    # Custom classes shared by every session and kept across restarts.
+    # Each class keeps a stable integer ID; every write bumps a version
+    # counter so readers can tell when their cached class list is stale.
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cached_version = None
+        self._cached_classes = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS classes ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " name TEXT NOT NULL UNIQUE,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS class_prompts ("
+                " class_id INTEGER NOT NULL REFERENCES classes (id) ON DELETE CASCADE,"
+                " position INTEGER NOT NULL,"
+                " prompt TEXT NOT NULL,"
+                " PRIMARY KEY (class_id, position))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS class_prompts_prompt ON class_prompts (prompt)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @property
+    def version(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def add_class(self, name, prompts):
+        # Adding an existing name replaces its prompts but keeps its ID.
+        prompts = clean_prompts(prompts)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT id FROM classes WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                class_id = conn.execute(
+                    "INSERT INTO classes (name, created_at) VALUES (?, ?)", (name, time.time())
+                ).lastrowid
+            else:
+                class_id = row[0]
+                conn.execute("DELETE FROM class_prompts WHERE class_id = ?", (class_id,))
+            conn.executemany(
+                "INSERT INTO class_prompts (class_id, position, prompt) VALUES (?, ?, ?)",
+                [(class_id, position, prompt) for position, prompt in enumerate(prompts)]
+            )
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return class_id
+
+    def remove_class(self, name):
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM classes WHERE name = ?", (name,)).rowcount
+            if removed:
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return bool(removed)
+
+    def list_classes(self):
+        # Returns [{"id", "name", "prompts"}] in creation order, re-reading
+        # the tables only when another writer has bumped the version.
+        version = self.version
+        with self._lock:
+            if version == self._cached_version:
+                return self._cached_classes
+        with self._connect() as conn:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            rows = conn.execute(
+                "SELECT c.id, c.name, p.prompt FROM classes c"
+                " LEFT JOIN class_prompts p ON p.class_id = c.id"
+                " ORDER BY c.id, p.position"
+            ).fetchall()
+        classes = []
+        by_id = {}
+        for class_id, name, prompt in rows:
+            if class_id not in by_id:
+                by_id[class_id] = {"id": class_id, "name": name, "prompts": []}
+                classes.append(by_id[class_id])
+            if prompt is not None:
+                by_id[class_id]["prompts"].append(prompt)
+        with self._lock:
+            self._cached_version = version
+            self._cached_classes = classes
+        return classes
+
+    def get_class(self, name):
+        return next((cls for cls in self.list_classes() if cls["name"] == name), None)
+
+    def classes_for_prompt(self, prompt):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT c.name FROM class_prompts p JOIN classes c ON c.id = p.class_id"
+                " WHERE p.prompt = ? ORDER BY c.id",
+                (prompt,)
+            ).fetchall()
+        return [row[0] for row in rows]
@@ -0,0 +1,69 @@
+import threading
+
+
+INITIAL_CLASSES = [
+    {"name": "AquaticSports", "prompts": ["swimming competition", "diving event", "water polo match", "synchronized swimming", "open water swimming"]},
+    {"name": "AthleticEvents", "prompts": ["track and field", "marathon running", "long jump competition", "javelin throw", "high jump event"]},
+    {"name": "GymnasticsEvents", "prompts": ["artistic gymnastics", "rhythmic gymnastics", "trampoline gymnastics", "balance beam routine", "floor exercise performance"]},
+    {"name": "CombatSports", "prompts": ["boxing match", "judo competition", "wrestling bout", "taekwondo fight", "fencing duel"]},
+    {"name": "TeamSports", "prompts": ["basketball game", "volleyball match", "football (soccer) match", "handball game", "field hockey competition"]},
+    {"name": "CyclingSports", "prompts": ["road cycling race", "track cycling event", "mountain bike competition", "BMX racing", "cycling time trial"]},
+    {"name": "RacquetSports", "prompts": ["tennis match", "badminton game", "table tennis competition", "squash game", "tennis doubles match"]},
+    {"name": "RowingAndSailing", "prompts": ["rowing competition", "sailing race", "canoe sprint", "kayak event", "windsurfing competition"]}
+]
+
+
+class PromptClassIndex:
+    # Inverted index from prompt to the names of every class containing it.
+    # version records which class-store version the index reflects.
+
+    def __init__(self, classes=(), version=None):
+        self._lock = threading.Lock()
+        self._by_prompt = {}
+        self._prompts_by_class = {}
+        self.version = None
+        self.rebuild(classes, version)
+
+    def rebuild(self, classes, version=None):
+        with self._lock:
+            self._by_prompt = {}
+            self._prompts_by_class = {}
+            for cls in classes:
+                self._add(cls["name"], cls["prompts"])
+            self.version = version
+
+    def apply(self, name, prompts, from_version, to_version):
+        # Incrementally adds or replaces one class. Returns False (leaving the
+        # index untouched) when the index is not at from_version, e.g. because
+        # another process wrote in between; the caller should rebuild instead.
+        with self._lock:
+            if self.version != from_version:
+                return False
+            self._remove(name)
+            self._add(name, prompts)
+            self.version = to_version
+            return True
+
+    def classes_for(self, prompt, class_names=None):
+        # Classes containing prompt, ordered by class_names when given.
+        with self._lock:
+            owners = self._by_prompt.get(prompt, ())
+            if class_names is None:
+                return list(owners)
+            return [name for name in class_names if name in owners]
+
+    def _add(self, name, prompts):
+        self._prompts_by_class.setdefault(name, [])
+        for prompt in prompts:
+            owners = self._by_prompt.setdefault(prompt, [])
+            if name not in owners:
+                owners.append(name)
+                self._prompts_by_class[name].append(prompt)
+
+    def _remove(self, name):
+        for prompt in self._prompts_by_class.pop(name, []):
+            owners = self._by_prompt.get(prompt, [])
+            if name in owners:
+                owners.remove(name)
+            if not owners:
+                self._by_prompt.pop(prompt, None)
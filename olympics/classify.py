@@ -0,0 +1,100 @@
+import json
+import os
+
+
+# Clip scores are discounted by the API's confidence label before being
+# compared across classes, so one low-confidence clip cannot outweigh a
+# class with high-confidence matches.
+CONFIDENCE_WEIGHTS = {"high": 1.0, "medium": 0.75, "low": 0.5}
+
+
+def weighted_score(row):
+    return (row["score"] or 0.0) * CONFIDENCE_WEIGHTS.get(row["confidence"], 0.5)
+
+
+class ClassAggregator:
+    # Folds clip rows (see olympics.export.result_rows) into per-video,
+    # per-class evidence: the best weighted clip, clip count and prompts hit.
+
+    def __init__(self):
+        self._videos = {}
+
+    def add(self, rows):
+        for row in rows:
+            classes = self._videos.setdefault(row["video_id"], {})
+            entry = classes.get(row["class"])
+            if entry is None:
+                entry = classes[row["class"]] = {"score": 0.0, "confidence": None, "clips": 0, "prompts": set()}
+            entry["clips"] += 1
+            entry["prompts"].add(row["prompt"])
+            score = weighted_score(row)
+            if score > entry["score"] or entry["confidence"] is None:
+                entry["score"] = score
+                entry["confidence"] = row["confidence"]
+
+    def __len__(self):
+        return len(self._videos)
+
+    def assignments(self):
+        # Yields one dict per video with its classes ranked best first; ties
+        # go to the class with more supporting clips.
+        for video_id in sorted(self._videos):
+            ranked = sorted(
+                self._videos[video_id].items(),
+                key=lambda item: (item[1]["score"], item[1]["clips"]),
+                reverse=True
+            )
+            classes = [
+                {
+                    "class": name,
+                    "score": round(entry["score"], 3),
+                    "confidence": entry["confidence"],
+                    "clips": entry["clips"],
+                    "prompts": sorted(entry["prompts"]),
+                }
+                for name, entry in ranked
+            ]
+            yield {"video_id": video_id, "class": classes[0]["class"], "score": classes[0]["score"], "classes": classes}
+
+
+class Checkpoint:
+    # Append-only NDJSON log of finished prompts and their rows. Each line is
+    # flushed and fsynced, so an interrupted run loses at most the prompts
+    # that were in flight. Failed prompts are not recorded and run again.
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def load(self):
+        # Yields (prompt, rows) for every prompt already finished.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by the interruption.
+                    continue
+                yield entry["prompt"], entry["rows"]
+
+    def record(self, prompt, rows):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() > 0 and not self._ends_with_newline():
+                # Keep the next entry off a line left incomplete last time.
+                self._file.write("\n")
+        self._file.write(json.dumps({"prompt": prompt, "rows": rows}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
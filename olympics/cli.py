@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+
+from olympics.classes import INITIAL_CLASSES, PromptClassIndex
+from olympics.classify import Checkpoint, ClassAggregator
+from olympics.client import LazyClient, twelvelabs_client
+from olympics.export import EXPORT_FORMATS, export_results, iter_prompt_rows
+from olympics.rate_limit import RequestScheduler
+from olympics.search_engine import ConcurrentSearchEngine
+from olympics.video_resolver import VideoResolver, hls_url
+
+
+def load_classes(path=None):
+    # A JSON file shaped like INITIAL_CLASSES: [{"name": ..., "prompts": [...]}].
+    if path is None:
+        return list(INITIAL_CLASSES)
+    with open(path, encoding="utf-8") as f:
+        classes = json.load(f)
+    for cls in classes:
+        if not isinstance(cls, dict) or not cls.get("name") or not isinstance(cls.get("prompts"), list):
+            raise ValueError(f"{path}: every class needs a 'name' and a list of 'prompts'")
+    return classes
+
+
+def load_env():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def credentials():
+    api_key = os.getenv("API_KEY")
+    index_id = os.getenv("INDEX_ID")
+    if not api_key or not index_id:
+        raise SystemExit("API_KEY and INDEX_ID must be set (environment or .env)")
+    return api_key, index_id
+
+
+def build_scheduler(args):
+    return RequestScheduler(rate=args.rate_limit, burst=max(1, int(args.rate_limit * 2)))
+
+
+def build_engine(args, scheduler=None):
+    api_key, index_id = credentials()
+    # No result cache: a long batch job should not hold every result in memory.
+    return ConcurrentSearchEngine(
+        LazyClient(lambda: twelvelabs_client(api_key)),
+        index_id,
+        max_workers=args.max_workers,
+        timeout=args.timeout,
+        scheduler=scheduler or build_scheduler(args),
+        reuse_threshold=0
+    )
+
+
+def select_classes(classes, names):
+    if not names:
+        return classes
+    selected = [cls for cls in classes if cls["name"] in names]
+    missing = set(names) - {cls["name"] for cls in selected}
+    if missing:
+        raise SystemExit(f"Unknown classes: {', '.join(sorted(missing))}")
+    return selected
+
+
+def run_export(args):
+    classes = select_classes(load_classes(args.classes_file), args.classes)
+    index = PromptClassIndex(classes)
+    prompts = [prompt for cls in classes for prompt in cls["prompts"]]
+    if args.prompts_file:
+        with open(args.prompts_file, encoding="utf-8") as f:
+            prompts = [line.strip() for line in f if line.strip()]
+
+    def class_for_prompt(prompt):
+        class_names = index.classes_for(prompt)
+        return class_names[0] if class_names else "Unknown"
+
+    def on_error(prompt, error):
+        print(f"Search failed for '{prompt}': {error}", file=sys.stderr)
+
+    engine = build_engine(args)
+    if args.output == "-":
+        if args.format != "ndjson":
+            raise SystemExit("Parquet output needs --output PATH")
+        rows, errors = export_results(engine, prompts, class_for_prompt, sys.stdout.buffer, args.format,
+                                      args.chunk_size, args.pages, on_error)
+    else:
+        with open(args.output, "wb") as f:
+            rows, errors = export_results(engine, prompts, class_for_prompt, f, args.format,
+                                          args.chunk_size, args.pages, on_error)
+    print(f"Exported {rows} rows for {len(prompts) - len(errors)}/{len(prompts)} prompts", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def resolve_video_urls(resolver, video_ids, chunk_size):
+    # resolve() waits once per call with a single deadline, so a large index
+    # is resolved chunk_size IDs at a time to keep each call well inside it.
+    # Returns ({video_id: hls_url}, {video_id: exception}).
+    video_ids = list(dict.fromkeys(video_ids))
+    chunk_size = max(1, int(chunk_size))
+    video_urls = {}
+    failed = {}
+    for i in range(0, len(video_ids), chunk_size):
+        records, errors = resolver.resolve(video_ids[i:i + chunk_size])
+        video_urls.update((video_id, hls_url(record)) for video_id, record in records.items())
+        failed.update(errors)
+    return video_urls, failed
+
+
+def run_classify(args):
+    classes = select_classes(load_classes(args.classes_file), args.classes)
+    index = PromptClassIndex(classes)
+    prompts = list(dict.fromkeys(prompt for cls in classes for prompt in cls["prompts"]))
+    aggregator = ClassAggregator()
+
+    def add(prompt, rows):
+        # A prompt shared by several classes counts as evidence for each of them.
+        for class_name in index.classes_for(prompt):
+            aggregator.add(dict(row, **{"class": class_name}) for row in rows)
+
+    checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+    finished = set()
+    if checkpoint is not None:
+        for prompt, rows in checkpoint.load():
+            if prompt not in finished:
+                finished.add(prompt)
+                add(prompt, rows)
+        if finished:
+            print(f"Resuming: {len(finished & set(prompts))}/{len(prompts)} prompts already done", file=sys.stderr)
+
+    scheduler = build_scheduler(args)
+    engine = build_engine(args, scheduler)
+    todo = [prompt for prompt in prompts if prompt not in finished]
+    errors = 0
+    try:
+        for n, (prompt, rows, error) in enumerate(
+                iter_prompt_rows(engine, todo, lambda prompt: None, args.chunk_size, args.pages), 1):
+            if error is not None:
+                errors += 1
+                print(f"Search failed for '{prompt}': {error}", file=sys.stderr)
+                continue
+            add(prompt, rows)
+            if checkpoint is not None:
+                checkpoint.record(prompt, rows)
+            if n % 50 == 0:
+                print(f"{n}/{len(todo)} prompts searched", file=sys.stderr)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    video_urls = {}
+    if args.resolve_urls and len(aggregator):
+        api_key, index_id = credentials()
+        resolver = VideoResolver(api_key, index_id, max_workers=args.max_workers, scheduler=scheduler)
+        # About ten seconds of lookups per chunk at the configured rate.
+        chunk_size = max(args.max_workers, int(args.rate_limit * 10))
+        try:
+            video_urls, failed = resolve_video_urls(
+                resolver, [assignment["video_id"] for assignment in aggregator.assignments()], chunk_size)
+        finally:
+            resolver.close()
+        for video_id, error in failed.items():
+            print(f"Failed to get data for video ID: {video_id}. Error: {error}", file=sys.stderr)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for assignment in aggregator.assignments():
+            if args.resolve_urls:
+                assignment["video_url"] = video_urls.get(assignment["video_id"])
+            out.write(json.dumps(assignment) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Classified {len(aggregator)} videos from {len(prompts) - errors}/{len(prompts)} prompts", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def add_search_options(parser):
+    parser.add_argument("--classes-file", help="JSON list of {name, prompts} classes (default: built-in classes)")
+    parser.add_argument("--class", dest="classes", action="append", help="only use this class (repeatable)")
+    parser.add_argument("--max-workers", type=int, default=int(os.getenv("SEARCH_MAX_WORKERS", "8")))
+    parser.add_argument("--timeout", type=float, default=float(os.getenv("SEARCH_TIMEOUT", "30")))
+    parser.add_argument("--rate-limit", type=float, default=float(os.getenv("API_RATE_LIMIT", "10")),
+                        help="requests per second")
+
+
+def main(argv=None):
+    load_env()
+    parser = argparse.ArgumentParser(prog="python -m olympics.cli", description="Run Olympics searches without the UI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="stream clip-level search results to NDJSON or Parquet")
+    add_search_options(export)
+    export.add_argument("--prompts-file", help="one prompt per line, instead of the classes' prompts")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export.add_argument("--output", default="-", help="output path, or - for stdout (NDJSON only)")
+    export.add_argument("--chunk-size", type=int, default=32, help="prompts searched before their rows are written")
+    export.add_argument("--pages", type=int, default=1, help="result pages to fetch per prompt")
+    export.set_defaults(run=run_export)
+
+    classify = commands.add_parser("classify", help="assign each video in the index to its best-matching class")
+    add_search_options(classify)
+    classify.add_argument("--output", default="-", help="NDJSON output path, or - for stdout")
+    classify.add_argument("--checkpoint", help="log of finished prompts; rerun with the same path to resume")
+    classify.add_argument("--chunk-size", type=int, default=32, help="prompts searched at a time")
+    classify.add_argument("--pages", type=int, default=1, help="result pages to fetch per prompt")
+    classify.add_argument("--resolve-urls", action="store_true", help="add each video's HLS URL")
+    classify.set_defaults(run=run_classify)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
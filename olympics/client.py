@@ -0,0 +1,30 @@
+import threading
+
+
+class LazyClient:
+    # Stands in for the Twelve Labs client and builds it on first attribute
+    # access, so importing the SDK is deferred until something is searched.
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._client is not None
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def twelvelabs_client(api_key):
+    from twelvelabs import TwelveLabs
+    return TwelveLabs(api_key=api_key)
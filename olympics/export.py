@@ -0,0 +1,166 @@
+import json
+
+from olympics.pagination import next_page_token
+
+
+EXPORT_FIELDS = ("video_id", "start", "end", "score", "confidence", "prompt", "class")
+EXPORT_FORMATS = ("ndjson", "parquet")
+
+
+def result_rows(prompt, class_name, result):
+    # One flat row per clip; only plain values are kept so the SDK objects
+    # can be dropped as soon as a page has been turned into rows.
+    for item in result.data or []:
+        clips = getattr(item, "clips", None)
+        if clips is None:
+            clips = [item]
+        video_id = getattr(item, "id", None) or getattr(item, "video_id", None)
+        for clip in clips:
+            yield {
+                "video_id": getattr(clip, "video_id", None) or video_id,
+                "start": clip.start,
+                "end": clip.end,
+                "score": clip.score,
+                "confidence": clip.confidence,
+                "prompt": prompt,
+                "class": class_name,
+            }
+
+
+def iter_prompt_rows(engine, prompts, class_for_prompt, chunk_size=32, max_pages=1):
+    # Yields (prompt, rows, error) per prompt. Prompts are searched
+    # chunk_size at a time so at most one chunk's results are held at once.
+    prompts = list(dict.fromkeys(prompts))
+    chunk_size = max(1, int(chunk_size))
+    for i in range(0, len(prompts), chunk_size):
+        for prompt, result, error in engine.iter_search(prompts[i:i + chunk_size]):
+            if error is not None:
+                yield prompt, [], error
+                continue
+            class_name = class_for_prompt(prompt)
+            rows = list(result_rows(prompt, class_name, result))
+            try:
+                page, token = result, next_page_token(result)
+                for _ in range(max(1, int(max_pages)) - 1):
+                    if token is None:
+                        break
+                    page = engine.next_page(token)
+                    rows.extend(result_rows(prompt, class_name, page))
+                    token = next_page_token(page)
+            except Exception as e:
+                # Rows from the pages already fetched are still exported.
+                yield prompt, rows, e
+                continue
+            yield prompt, rows, None
+
+
+class NDJSONWriter:
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.rows_written = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.fileobj.write((json.dumps(row) + "\n").encode("utf-8"))
+            self.rows_written += 1
+
+    def close(self):
+        self.fileobj.flush()
+
+
+class ParquetWriter:
+    # Needs pyarrow. Rows are buffered up to batch_size and written as one
+    # row group, which bounds memory regardless of how many prompts run.
+
+    def __init__(self, fileobj, batch_size=10000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self.schema = pa.schema([
+            ("video_id", pa.string()),
+            ("start", pa.float64()),
+            ("end", pa.float64()),
+            ("score", pa.float64()),
+            ("confidence", pa.string()),
+            ("prompt", pa.string()),
+            ("class", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(fileobj, self.schema)
+        self.batch_size = max(1, int(batch_size))
+        self._buffer = []
+        self.rows_written = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        columns = {name: [row[name] for row in self._buffer] for name in EXPORT_FIELDS}
+        self._writer.write_table(self._pa.table(columns, schema=self.schema))
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        return False
+    return True
+
+
+def open_writer(fileobj, fmt="ndjson"):
+    # fileobj must be opened in binary mode.
+    if fmt == "ndjson":
+        return NDJSONWriter(fileobj)
+    if fmt == "parquet":
+        return ParquetWriter(fileobj)
+    raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+
+
+def export_results(engine, prompts, class_for_prompt, fileobj, fmt="ndjson", chunk_size=32, max_pages=1, on_error=None):
+    # Streams every prompt's clips into fileobj. Returns (rows_written, errors).
+    writer = open_writer(fileobj, fmt)
+    errors = {}
+    try:
+        for prompt, rows, error in iter_prompt_rows(engine, prompts, class_for_prompt, chunk_size, max_pages):
+            writer.write_rows(rows)
+            if error is not None:
+                errors[prompt] = error
+                if on_error is not None:
+                    on_error(prompt, error)
+    finally:
+        writer.close()
+    return writer.rows_written, errors
+
+
+def export_outcomes(outcomes, fileobj, fmt="ndjson"):
+    # Writes the results a search already holds ({prompt: (prompt_data, error)})
+    # without querying again. Returns the number of rows written.
+    # Prompts answered by one combined query are exported once, under the query.
+    writer = open_writer(fileobj, fmt)
+    written = set()
+    try:
+        for prompt, (prompt_data, error) in outcomes.items():
+            if prompt_data is None:
+                continue
+            query = prompt_data.get("query", prompt)
+            if query in written:
+                continue
+            written.add(query)
+            writer.write_rows(result_rows(query, prompt_data["class_name"], prompt_data["result"]))
+    finally:
+        writer.close()
+    return writer.rows_written
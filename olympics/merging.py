@@ -0,0 +1,58 @@
+from collections import namedtuple
+
+
+MergedClip = namedtuple("MergedClip", ["start", "end", "score", "confidence"])
+MergedVideo = namedtuple("MergedVideo", ["id", "score", "prompts", "clips"])
+
+CONFIDENCE_RANK = {"high": 3, "medium": 2, "low": 1}
+FUSION_METHODS = ("max", "rrf")
+
+
+def merge_intervals(clips):
+    # Overlapping or touching clips collapse into one, keeping the best score and confidence.
+    merged = []
+    for clip in sorted(clips, key=lambda c: (float(c.start), float(c.end))):
+        start, end, score = float(clip.start), float(clip.end), float(clip.score)
+        if merged and start <= merged[-1].end:
+            last = merged[-1]
+            confidence = max(last.confidence, clip.confidence, key=lambda c: CONFIDENCE_RANK.get(c, 0))
+            merged[-1] = MergedClip(last.start, max(last.end, end), max(last.score, score), confidence)
+        else:
+            merged.append(MergedClip(start, end, score, clip.confidence))
+    return merged
+
+
+def merge_videos(prompt_results, fusion="max", rrf_k=60):
+    # prompt_results: iterable of (prompt, items) where items are ranked search
+    # hits with .id and .clips. Returns one MergedVideo per video ID, best first.
+    if fusion not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method '{fusion}', expected one of {FUSION_METHODS}")
+
+    scores = {}
+    prompts = {}
+    clips = {}
+    for prompt, items in prompt_results:
+        for rank, item in enumerate(items, start=1):
+            if not item.clips:
+                continue
+            if fusion == "max":
+                score = max(float(clip.score) for clip in item.clips)
+                scores[item.id] = max(scores.get(item.id, score), score)
+            else:
+                scores[item.id] = scores.get(item.id, 0.0) + 1.0 / (rrf_k + rank)
+            prompts.setdefault(item.id, [])
+            if prompt not in prompts[item.id]:
+                prompts[item.id].append(prompt)
+            clips.setdefault(item.id, []).extend(item.clips)
+
+    merged = [
+        MergedVideo(
+            video_id,
+            scores[video_id],
+            prompts[video_id],
+            sorted(merge_intervals(clips[video_id]), key=lambda clip: clip.score, reverse=True)
+        )
+        for video_id in scores
+    ]
+    merged.sort(key=lambda video: video.score, reverse=True)
+    return merged
@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="page-prefetch")
+
+
+def next_page_token(page):
+    page_info = getattr(page, "page_info", None)
+    return getattr(page_info, "next_page_token", None) if page_info is not None else None
+
+
+class PagedResults:
+    # Lazy view over a search's pages. The first page is the search result
+    # itself; later pages are fetched through fetch_page(token) only when
+    # more items are asked for, after which the following page is
+    # prefetched in the background. At most max_items items are kept.
+
+    def __init__(self, first_page, fetch_page, max_items=100, prefetch=True):
+        self.first_page = first_page
+        self.fetch_page = fetch_page
+        self.max_items = max(1, int(max_items))
+        self.prefetch = prefetch
+        self._items = [item for item in first_page.data if getattr(item, "clips", None)][:self.max_items]
+        self._next_token = next_page_token(first_page)
+        self._prefetched = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return len(self._items)
+
+    def has_more(self, shown):
+        with self._lock:
+            return shown < len(self._items) or (self._next_token is not None and len(self._items) < self.max_items)
+
+    def items(self, count, fetch=True):
+        with self._lock:
+            while fetch and len(self._items) < min(count, self.max_items) and self._next_token is not None:
+                self._load_next_page()
+            if fetch and self.prefetch and self._next_token is not None and self._prefetched is None \
+                    and len(self._items) < self.max_items:
+                token = self._next_token
+                self._prefetched = (token, _prefetch_executor.submit(self.fetch_page, token))
+            return self._items[:count]
+
+    def _load_next_page(self):
+        token = self._next_token
+        prefetched, self._prefetched = self._prefetched, None
+        page = None
+        if prefetched is not None and prefetched[0] == token:
+            try:
+                page = prefetched[1].result()
+            except Exception:
+                # A failed prefetch is retried directly rather than re-raised.
+                page = None
+        if page is None:
+            page = self.fetch_page(token)
+        new_items = [item for item in page.data if getattr(item, "clips", None)]
+        self._items.extend(new_items[:self.max_items - len(self._items)])
+        self._next_token = next_page_token(page)
@@ -0,0 +1,83 @@
+import threading
+import time
+
+
+class PrewarmJob:
+    # Searches every prompt of the given classes one at a time (stagger
+    # seconds apart) and resolves the hits' video records, so the shared
+    # search and video caches already hold them when a user asks.
+
+    def __init__(self, engine, resolver, classes, stagger=1.0):
+        self.engine = engine
+        self.resolver = resolver
+        self.classes = classes
+        self.stagger = float(stagger)
+        self._run_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._status = {
+            "running": False,
+            "last_started": None,
+            "last_finished": None,
+            "last_duration": None,
+            "prompts_total": 0,
+            "prompts_warmed": 0,
+            "videos_warmed": 0,
+            "errors": 0,
+        }
+
+    def prompts(self):
+        classes = self.classes() if callable(self.classes) else self.classes
+        return list(dict.fromkeys(prompt for cls in classes for prompt in cls["prompts"]))
+
+    def run(self):
+        # Overlapping runs would only double the API load.
+        if not self._run_lock.acquire(blocking=False):
+            return
+        try:
+            self._warm()
+        finally:
+            self._run_lock.release()
+
+    def _warm(self):
+        prompts = self.prompts()
+        started = time.time()
+        self._update(running=True, last_started=started, prompts_total=len(prompts))
+
+        warmed = 0
+        errors = 0
+        video_ids = set()
+        for i, prompt in enumerate(prompts):
+            if i:
+                time.sleep(self.stagger)
+            for _, result, error in self.engine.iter_search([prompt], refresh=True):
+                if error is not None:
+                    errors += 1
+                    print(f"Pre-warm search failed for '{prompt}': {str(error)}")
+                    continue
+                warmed += 1
+                ids = [item.id for item in result.data if getattr(item, "clips", None)]
+                records, lookup_errors = self.resolver.resolve(ids)
+                video_ids.update(records)
+                errors += len(lookup_errors)
+
+        finished = time.time()
+        self._update(
+            running=False,
+            last_finished=finished,
+            last_duration=finished - started,
+            prompts_warmed=warmed,
+            videos_warmed=len(video_ids),
+            errors=errors
+        )
+        print(f"Pre-warm finished: {warmed}/{len(prompts)} prompts, {len(video_ids)} videos, {errors} errors")
+
+    def _update(self, **changes):
+        with self._status_lock:
+            self._status.update(changes)
+
+    def status(self):
+        with self._status_lock:
+            status = dict(self._status)
+        total = status["prompts_total"]
+        status["coverage"] = status["prompts_warmed"] / total if total else 0.0
+        return status
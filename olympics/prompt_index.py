@@ -0,0 +1,113 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+
+def normalize_prompt(prompt):
+    return " ".join(re.findall(r"[a-z0-9]+", prompt.lower()))
+
+
+def singular(word):
+    # Rough plural stripping; it only has to map both forms of a word to the
+    # same string ("matches"/"match", "events"/"event").
+    if len(word) <= 3 or not word.endswith("s") or word.endswith("ss"):
+        return word
+    if word.endswith(("xes", "zes", "ches", "shes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def word_key(prompt):
+    # Prompts with the same key differ only in case, punctuation, hyphens,
+    # word order or plurals. Any extra or missing word ("mens", "no") changes
+    # what is being searched for, however similar the spelling.
+    return frozenset(singular(word) for word in normalize_prompt(prompt).split())
+
+
+class NgramEmbedder:
+    # Hashed character n-grams plus whole words, L2-normalised. Cheap and
+    # CPU-only; it catches rewordings that share most of their spelling
+    # ("swimming competitions", "Swimming-competition") rather than synonyms.
+    # Words are singularised first so plurals embed identically.
+
+    def __init__(self, dim=2048, n=3, word_weight=0.5):
+        self.dim = int(dim)
+        self.n = int(n)
+        self.word_weight = float(word_weight)
+
+    def features(self, prompt):
+        for word in map(singular, normalize_prompt(prompt).split()):
+            yield "w:" + word, self.word_weight
+            padded = f"#{word}#"
+            for i in range(max(1, len(padded) - self.n + 1)):
+                yield "c:" + padded[i:i + self.n], 1.0
+
+    def embed(self, prompt):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(prompt):
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dim] += weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class PromptIndex:
+    # Brute-force cosine nearest-neighbour search over previously searched
+    # prompts. Rows live in one preallocated matrix; the oldest prompt is
+    # overwritten once max_prompts is reached. Only prompts with the same
+    # word_key are returned as matches.
+
+    def __init__(self, embedder=None, max_prompts=5000):
+        self.embedder = embedder or NgramEmbedder()
+        self.max_prompts = max(1, int(max_prompts))
+        self._matrix = np.zeros((min(256, self.max_prompts), self.embedder.dim), dtype=np.float32)
+        self._prompts = []
+        self._word_keys = []
+        self._rows = {}
+        self._next_row = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._prompts)
+
+    def add(self, prompt):
+        key = normalize_prompt(prompt)
+        if not key:
+            return
+        vector = self.embedder.embed(prompt)
+        with self._lock:
+            if key in self._rows:
+                return
+            if len(self._prompts) < self.max_prompts:
+                if len(self._prompts) == len(self._matrix):
+                    grown = np.zeros((min(len(self._matrix) * 2, self.max_prompts), self.embedder.dim), dtype=np.float32)
+                    grown[:len(self._matrix)] = self._matrix
+                    self._matrix = grown
+                row = len(self._prompts)
+                self._prompts.append(prompt)
+                self._word_keys.append(None)
+            else:
+                row = self._next_row
+                del self._rows[normalize_prompt(self._prompts[row])]
+                self._prompts[row] = prompt
+                self._next_row = (row + 1) % self.max_prompts
+            self._matrix[row] = vector
+            self._word_keys[row] = word_key(prompt)
+            self._rows[key] = row
+
+    def nearest(self, prompt, threshold=0.0):
+        # Returns (indexed_prompt, similarity) or None.
+        vector = self.embedder.embed(prompt)
+        key = word_key(prompt)
+        with self._lock:
+            count = len(self._prompts)
+            if not count:
+                return None
+            similarities = self._matrix[:count] @ vector
+            candidates = np.flatnonzero(similarities >= threshold)
+            for row in candidates[np.argsort(-similarities[candidates], kind="stable")]:
+                if self._word_keys[row] == key:
+                    return self._prompts[row], float(similarities[row])
+        return None
@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+PRIORITY_SEARCH = 0
+PRIORITY_VIDEO_LOOKUP = 1
+PRIORITY_BACKGROUND = 2
+
+
+class RateLimited(Exception):
+    pass
+
+
+def is_rate_limited(error):
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status is not None:
+        return status == 429
+    # Only errors without a status are judged by their message; a bare "429"
+    # is not matched because index and video IDs can contain it.
+    message = str(error).lower()
+    return "too many requests" in message or "rate limit" in message
+
+
+class TokenBucket:
+    # Not thread-safe on its own; RequestScheduler serialises access.
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class RequestScheduler:
+    # Process-wide gate for outbound Twelve Labs calls. Waiters are served in
+    # priority order (lower value first) as tokens become available. The rate
+    # halves on every 429 and creeps back up on success (AIMD).
+
+    def __init__(self, rate=10.0, burst=20, min_rate=0.5, max_rate=None, backoff=1.0,
+                 max_retries=3, clock=time.monotonic):
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.min_rate = float(min_rate)
+        self.backoff = float(backoff)
+        self.max_retries = max(0, int(max_retries))
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst, clock=clock)
+        self._paused_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {"granted": 0, "throttled": 0, "max_queue_depth": 0}
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    @property
+    def queue_depth(self):
+        with self._cond:
+            return len(self._waiters)
+
+    def acquire(self, priority=PRIORITY_SEARCH):
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+            # A new higher-priority waiter may now be at the head.
+            self._cond.notify_all()
+            try:
+                while True:
+                    if self._waiters[0] != ticket:
+                        self._cond.wait()
+                        continue
+                    wait = max(self.bucket.wait_time(), self._paused_until - self.clock())
+                    if wait <= 0:
+                        self.bucket.consume()
+                        heapq.heappop(self._waiters)
+                        self._stats["granted"] += 1
+                        self._cond.notify_all()
+                        return
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def record_success(self):
+        with self._cond:
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate * 0.05)
+
+    def record_throttle(self, retry_after=None):
+        with self._cond:
+            self._stats["throttled"] += 1
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+            try:
+                pause = float(retry_after) if retry_after else self.backoff
+            except ValueError:
+                pause = self.backoff
+            self._paused_until = max(self._paused_until, self.clock() + pause)
+
+    def call(self, fn, *args, priority=PRIORITY_SEARCH, **kwargs):
+        attempt = 0
+        while True:
+            self.acquire(priority)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                self.record_throttle()
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                continue
+            self.record_success()
+            return result
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._waiters)
+            stats["rate"] = self.bucket.rate
+        return stats
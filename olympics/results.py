@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+
+
+# Compact stand-ins for the SDK's search models. Only the fields the app
+# reads are kept, so cached and session-held results stay small; the raw
+# payload (search pool, per-clip metadata, thumbnails) is dropped as soon as
+# a page arrives.
+
+@dataclass(slots=True)
+class Clip:
+    start: float
+    end: float
+    score: float
+    confidence: str
+
+
+@dataclass(slots=True)
+class VideoHit:
+    id: str
+    clips: tuple
+
+
+@dataclass(slots=True)
+class PageInfo:
+    next_page_token: str = None
+
+
+@dataclass(slots=True)
+class SearchResult:
+    data: tuple
+    page_info: PageInfo
+
+
+def compact_clip(clip):
+    return Clip(float(clip.start), float(clip.end), float(clip.score), clip.confidence)
+
+
+def compact_result(result):
+    # Accepts an SDK search page (grouped by video or not) and returns a
+    # SearchResult. Already-compact results are returned unchanged.
+    if result is None or isinstance(result, SearchResult):
+        return result
+    hits = {}
+    for item in result.data or []:
+        clips = getattr(item, "clips", None)
+        if clips is not None:
+            hits.setdefault(item.id, []).extend(compact_clip(clip) for clip in clips)
+        else:
+            # Ungrouped hits are one clip each; fold them into their video.
+            hits.setdefault(item.video_id, []).append(compact_clip(item))
+    page_info = getattr(result, "page_info", None)
+    return SearchResult(
+        tuple(VideoHit(video_id, tuple(clips)) for video_id, clips in hits.items()),
+        PageInfo(getattr(page_info, "next_page_token", None))
+    )
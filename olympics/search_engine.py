@@ -0,0 +1,297 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from olympics.cache import search_cache_key
+from olympics.circuit_breaker import HALF_OPEN
+from olympics.metrics import Metrics
+from olympics.rate_limit import PRIORITY_SEARCH
+from olympics.results import compact_result
+
+
+DEFAULT_SEARCH_PARAMS = {
+    "options": ["visual", "audio"],
+    "group_by": "video",
+    "threshold": "medium",
+    "operator": "or",
+    "page_limit": 5,
+    "sort_option": "score",
+}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def combined_query(prompts):
+    # A single literal query text: the API's operator only combines search
+    # options, so hits of a combined query cannot be traced to one prompt.
+    return " or ".join(prompts)
+
+
+class ConcurrentSearchEngine:
+    # Fans prompt searches out over a bounded thread pool. Every prompt is
+    # isolated: a failure or timeout only affects its own entry.
+
+    def __init__(self, client, index_id, max_workers=8, timeout=30.0, search_params=None, cache=None,
+                 scheduler=None, single_flight=None, priority=PRIORITY_SEARCH, metrics=None,
+                 prompt_index=None, reuse_threshold=0.85, breaker=None):
+        self.client = client
+        self.index_id = index_id
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = float(timeout)
+        self.search_params = dict(DEFAULT_SEARCH_PARAMS)
+        if search_params:
+            self.search_params.update(search_params)
+        self.cache = cache
+        self.scheduler = scheduler
+        self.single_flight = single_flight
+        self.priority = priority
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.prompt_index = prompt_index
+        self.reuse_threshold = float(reuse_threshold)
+        # prompt -> (similar_prompt, similarity) for results the current
+        # iter_search served from a near-duplicate prompt's cached result.
+        self.approximations = {}
+        # While breaker is open, prompts are answered from expired cache
+        # entries when there are any; the current iter_search's are in stale.
+        self.breaker = breaker
+        self.stale = set()
+
+    def cache_key(self, prompt):
+        return search_cache_key(self.index_id, prompt, self.search_params)
+
+    def query(self, prompt, on_queue=None):
+        return self._call(self._query, prompt, on_queue=on_queue)
+
+    def next_page(self, page_token):
+        return self._call(self._next_page, page_token)
+
+    def _call(self, fn, *args, on_queue=None):
+        # on_queue(True) is called when the call starts waiting for a rate
+        # limit token and on_queue(False) once it has one.
+        if self.breaker is not None:
+            # Fail fast rather than queueing behind the rate limiter.
+            if not self.breaker.available():
+                raise self.breaker.open_error()
+            args = (fn,) + args
+            fn = self.breaker.call
+        if self.scheduler is not None:
+            if on_queue is not None:
+                on_queue(True)
+                granted = fn
+
+                def fn(*args):
+                    on_queue(False)
+                    return granted(*args)
+            return self.scheduler.call(fn, *args, priority=self.priority)
+        return fn(*args)
+
+    def _next_page(self, page_token):
+        self.metrics.increment("search.api_calls")
+        with self.metrics.timer("search.next_page"):
+            return compact_result(self.client.search.by_page_token(page_token=page_token))
+
+    def _query_and_cache(self, prompt, refresh=False, on_queue=None):
+        if self.cache is not None and not refresh:
+            # Checked again once the call is due: another session's search
+            # may have stored this prompt since iter_search looked it up.
+            result = self._cached(prompt)
+            if result is not None:
+                self.metrics.increment("search.late_cache_hits")
+                return result
+        result = self.query(prompt, on_queue)
+        if self.cache is not None:
+            self.cache.set(self.cache_key(prompt), result)
+            self._remember(prompt)
+        return result
+
+    def _cached(self, prompt):
+        # Entries written before results were compacted are converted on read.
+        return compact_result(self.cache.get(self.cache_key(prompt)))
+
+    def _stale(self, prompt):
+        # An expired cached result to serve while the API is unavailable.
+        if self.breaker is None or self.cache is None or not hasattr(self.cache, "get_stale"):
+            return None
+        result = compact_result(self.cache.get_stale(self.cache_key(prompt)))
+        if result is not None:
+            self.metrics.increment("search.stale_hits")
+            self.stale.add(prompt)
+        return result
+
+    def _remember(self, prompt):
+        if self.prompt_index is not None:
+            self.prompt_index.add(prompt)
+
+    def _approximate(self, prompt):
+        if self.prompt_index is None or self.reuse_threshold <= 0:
+            return None
+        match = self.prompt_index.nearest(prompt, threshold=self.reuse_threshold)
+        if match is None:
+            return None
+        similar_prompt, similarity = match
+        result = self._cached(similar_prompt)
+        if result is None:
+            return None
+        return similar_prompt, similarity, result
+
+    def _query(self, prompt):
+        self.metrics.increment("search.api_calls")
+        with self.metrics.timer("search.query"):
+            return compact_result(self.client.search.query(
+                index_id=self.index_id,
+                query_text=prompt,
+                **self.search_params
+            ))
+
+    def iter_search(self, prompts, refresh=False):
+        # Yields (prompt, result, error) tuples in completion order.
+        # refresh=True skips cache reads but still stores fresh results.
+        prompts = list(dict.fromkeys(prompts))
+        self.approximations = {}
+        self.stale = set()
+        if self.cache is not None and not refresh:
+            misses = []
+            for prompt in prompts:
+                result = self._cached(prompt)
+                if result is not None:
+                    self.metrics.increment("search.cache_hits")
+                    self._remember(prompt)
+                    yield prompt, result, None
+                    continue
+                self.metrics.increment("search.cache_misses")
+                approximate = self._approximate(prompt)
+                if approximate is None:
+                    misses.append(prompt)
+                    continue
+                similar_prompt, similarity, result = approximate
+                self.metrics.increment("search.approximate_hits")
+                self.approximations[prompt] = (similar_prompt, similarity)
+                yield prompt, result, None
+            prompts = misses
+        while prompts and self.breaker is not None and self.breaker.state == HALF_OPEN and self.breaker.available():
+            # Only one probe gets through a half-open circuit, so it is sent
+            # alone; the rest fan out once it has closed the circuit.
+            probe, prompts = prompts[0], prompts[1:]
+            self.metrics.increment("search.probes")
+            yield from self._fan_out([probe], refresh)
+        if not prompts:
+            return
+        if self.breaker is not None and not self.breaker.available():
+            # The circuit is open: answer from stale entries without waiting on the API.
+            error = self.breaker.open_error()
+            for prompt in prompts:
+                result = self._stale(prompt)
+                yield prompt, result, None if result is not None else error
+            return
+        yield from self._fan_out(prompts, refresh)
+
+    def _fan_out(self, prompts, refresh):
+        started = {}
+
+        def queued(prompt, waiting):
+            # The timeout does not run while the call waits for a rate limit
+            # token, so a throttled search is delayed rather than failed.
+            if waiting:
+                started.pop(prompt, None)
+            else:
+                started[prompt] = time.monotonic()
+
+        def run(prompt):
+            started[prompt] = time.monotonic()
+            on_queue = partial(queued, prompt)
+            if self.single_flight is not None:
+                return self.single_flight.do(self.cache_key(prompt), self._query_and_cache, prompt, refresh, on_queue)
+            return self._query_and_cache(prompt, refresh, on_queue)
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(prompts)),
+            thread_name_prefix="search"
+        )
+        try:
+            futures = {executor.submit(run, prompt): prompt for prompt in prompts}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self._next_deadline(started, pending, futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    prompt = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = self._stale(prompt)
+                        if result is not None:
+                            yield prompt, result, None
+                            continue
+                        self.metrics.increment("search.errors")
+                        yield prompt, None, e
+                    else:
+                        yield prompt, result, None
+
+                now = time.monotonic()
+                for future in list(pending):
+                    prompt = futures[future]
+                    start = started.get(prompt)
+                    if start is not None and now - start >= self.timeout:
+                        pending.discard(future)
+                        future.cancel()
+                        self.metrics.increment("search.timeouts")
+                        result = self._stale(prompt)
+                        if result is not None:
+                            yield prompt, result, None
+                            continue
+                        yield prompt, None, SearchTimeout(f"Search for '{prompt}' timed out after {self.timeout:.0f}s")
+        finally:
+            # Timed-out calls cannot be interrupted; let them finish in the background.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search(self, prompts, class_for_prompt=None):
+        results = {}
+        errors = {}
+        for prompt, result, error in self.iter_search(prompts):
+            if error is not None:
+                errors[prompt] = error
+                continue
+            results[prompt] = {
+                "class_name": class_for_prompt(prompt) if class_for_prompt else "Unknown",
+                "result": result
+            }
+
+        results_by_prompt = {prompt: results[prompt] for prompt in dict.fromkeys(prompts) if prompt in results}
+        return results_by_prompt, errors
+
+    def iter_search_batched(self, prompt_groups, batch_size=5, min_results=1):
+        # Sends each group (e.g. a class's prompts) as combined queries of up
+        # to batch_size prompts. A combined query that fails or finds fewer
+        # than min_results hits is split in half and retried, down to single
+        # prompts. Yields (query_text, prompts, result, error).
+        batch_size = max(1, int(batch_size))
+        pending = {}
+        for group in prompt_groups:
+            group = list(dict.fromkeys(group))
+            for i in range(0, len(group), batch_size):
+                chunk = group[i:i + batch_size]
+                pending[combined_query(chunk)] = chunk
+
+        while pending:
+            next_round = {}
+            for query_text, result, error in self.iter_search(list(pending)):
+                prompts = pending[query_text]
+                hits = len(result.data or []) if error is None else 0
+                if len(prompts) > 1 and (error is not None or hits < min_results):
+                    half = len(prompts) // 2
+                    for chunk in (prompts[:half], prompts[half:]):
+                        next_round[combined_query(chunk)] = chunk
+                    continue
+                yield query_text, prompts, result, error
+            pending = next_round
+
+    def _next_deadline(self, started, pending, futures):
+        now = time.monotonic()
+        # Workers update started concurrently, so each start is read once.
+        starts = [started.get(futures[future]) for future in pending]
+        remaining = [self.timeout - (now - start) for start in starts if start is not None]
+        if len(remaining) < len(pending):
+            # Some prompts are still queued; poll so their deadline is tracked once they start.
+            remaining.append(0.1)
+        return max(0.0, min(remaining)) if remaining else None
@@ -0,0 +1,243 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from olympics.cache import TTLCache
+from olympics.circuit_breaker import HALF_OPEN
+from olympics.metrics import Metrics
+from olympics.rate_limit import PRIORITY_VIDEO_LOOKUP
+
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class VideoResolver:
+    # Resolves video IDs to their /videos/{id} records over one pooled
+    # keep-alive session. Concurrent requests for the same ID share a future.
+    # Records are cached; entries past refresh_ratio of their TTL are served
+    # as-is while a background lookup replaces them.
+
+    def __init__(self, api_key, index_id, base_url="https://api.twelvelabs.io/v1.3",
+                 max_workers=16, timeout=10.0, max_retries=3, backoff=0.5, max_backoff=8.0,
+                 session=None, cache=None, cache_ttl=6 * 3600.0, refresh_ratio=0.8,
+                 missing_ttl=60.0, scheduler=None, metrics=None, breaker=None):
+        self.api_key = api_key
+        self.index_id = index_id
+        self.base_url = base_url.rstrip("/")
+        self.timeout = float(timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self.session = session or self._build_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="video-url")
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.cache_ttl = float(cache_ttl)
+        self.refresh_after = self.cache_ttl * float(refresh_ratio)
+        self.missing_ttl = float(missing_ttl)
+        self.scheduler = scheduler
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.cache = cache if cache is not None else TTLCache(maxsize=4096, ttl=self.cache_ttl)
+        # While breaker is open, lookups fail fast and resolve() falls back to expired records.
+        self.breaker = breaker
+
+    def _build_session(self, pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(pool_size)))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"x-api-key": self.api_key, "Content-Type": "application/json"})
+        return session
+
+    def video_endpoint(self, video_id):
+        return f"{self.base_url}/indexes/{self.index_id}/videos/{video_id}"
+
+    def fetch_video(self, video_id, metrics=None):
+        metrics = metrics if metrics is not None else self.metrics
+        attempt = 0
+        while True:
+            if self.breaker is not None and not self.breaker.allow():
+                raise self.breaker.open_error()
+            if self.scheduler is not None:
+                self.scheduler.acquire(PRIORITY_VIDEO_LOOKUP)
+            try:
+                metrics.increment("video.api_calls")
+                start = time.perf_counter()
+                with metrics.timer("video.fetch"):
+                    try:
+                        response = self.session.get(self.video_endpoint(video_id), timeout=self.timeout)
+                    except requests.exceptions.RequestException:
+                        if self.breaker is not None:
+                            self.breaker.record_failure()
+                        raise
+                if self.breaker is not None:
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    elif response.status_code < 400:
+                        self.breaker.record_success(time.perf_counter() - start)
+                    else:
+                        self.breaker.release()
+                if self.scheduler is not None:
+                    if response.status_code == 429:
+                        self.scheduler.record_throttle(response.headers.get("Retry-After"))
+                    elif response.status_code < 400:
+                        self.scheduler.record_success()
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    attempt += 1
+                    metrics.increment("video.retries")
+                    # On 429 the scheduler already pauses every caller before the next acquire.
+                    if not (self.scheduler is not None and response.status_code == 429):
+                        time.sleep(self._retry_delay(attempt, response))
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                metrics.increment("video.retries")
+                time.sleep(self._retry_delay(attempt))
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent retries from hitting the API in lockstep.
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** (attempt - 1))))
+
+    def submit(self, video_id, metrics=None):
+        with self._lock:
+            future = self._inflight.get(video_id)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._fetch_and_cache, video_id, metrics)
+            self._inflight[video_id] = future
+        # Registered outside the lock: a future that is already done runs the
+        # callback immediately in this thread, and _forget takes the lock.
+        future.add_done_callback(lambda f, video_id=video_id: self._forget(video_id, f))
+        return future
+
+    def _forget(self, video_id, future):
+        with self._lock:
+            if self._inflight.get(video_id) is future:
+                del self._inflight[video_id]
+
+    def _fetch_and_cache(self, video_id, metrics=None):
+        record = self.fetch_video(video_id, metrics)
+        # Videos still being processed have no HLS URL yet; check again soon.
+        ttl = self.cache_ttl if hls_url(record) else self.missing_ttl
+        self.cache.set(video_id, (record, time.monotonic()), ttl)
+        return record
+
+    def cached(self, video_id, metrics=None):
+        metrics = metrics if metrics is not None else self.metrics
+        entry = self.cache.get(video_id)
+        if entry is None:
+            metrics.increment("video.cache_misses")
+            return None
+        metrics.increment("video.cache_hits")
+        record, fetched_at = entry
+        if time.monotonic() - fetched_at >= self.refresh_after:
+            self.submit(video_id, metrics)
+        return record
+
+    def invalidate(self, video_id=None):
+        if video_id is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(video_id)
+
+    def _stale(self, video_id, metrics):
+        get_stale = getattr(self.cache, "get_stale", None)
+        entry = get_stale(video_id) if self.breaker is not None and get_stale else None
+        if entry is None:
+            return None
+        metrics.increment("video.stale_hits")
+        return entry[0]
+
+    def resolve(self, video_ids, stale=None, metrics=None):
+        # Returns ({video_id: record}, {video_id: exception}). IDs answered
+        # from an expired record are added to stale when a set is given.
+        # metrics (e.g. one search's, parented to self.metrics) receives this
+        # call's lookups; a lookup already in flight for another caller stays
+        # attributed to that caller.
+        metrics = metrics if metrics is not None else self.metrics
+        records = {}
+        errors = {}
+        misses = []
+        for video_id in dict.fromkeys(video_ids):
+            record = self.cached(video_id, metrics)
+            if record is not None:
+                records[video_id] = record
+            else:
+                misses.append(video_id)
+        while misses and self.breaker is not None and self.breaker.state == HALF_OPEN and self.breaker.available():
+            # Only one probe gets through a half-open circuit, so it is sent
+            # alone; the rest fan out once it has closed the circuit.
+            video_id = misses.pop(0)
+            metrics.increment("video.probes")
+            self._collect({video_id: self.submit(video_id, metrics)}, records, errors, stale, metrics)
+        if not misses:
+            return records, errors
+
+        if self.breaker is not None and not self.breaker.available():
+            # Don't wait on lookups that can only fail while the circuit is open.
+            for video_id in misses:
+                record = self._stale(video_id, metrics)
+                if record is not None:
+                    records[video_id] = record
+                    if stale is not None:
+                        stale.add(video_id)
+                else:
+                    errors[video_id] = self.breaker.open_error()
+            return records, errors
+
+        futures = {video_id: self.submit(video_id, metrics) for video_id in misses}
+        self._collect(futures, records, errors, stale, metrics)
+        return records, errors
+
+    def _collect(self, futures, records, errors, stale, metrics):
+        deadline = self.timeout * (self.max_retries + 1) + self.max_backoff * self.max_retries
+        wait(futures.values(), timeout=deadline)
+
+        for video_id, future in futures.items():
+            if not future.done():
+                error = requests.exceptions.Timeout(f"Lookup for video {video_id} did not finish in {deadline:.0f}s")
+            else:
+                try:
+                    records[video_id] = future.result()
+                    continue
+                except Exception as e:
+                    error = e
+            record = self._stale(video_id, metrics)
+            if record is not None:
+                records[video_id] = record
+                if stale is not None:
+                    stale.add(video_id)
+                continue
+            metrics.increment("video.errors")
+            errors[video_id] = error
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+def hls_url(record):
+    hls = record.get("hls") if isinstance(record, dict) else None
+    if hls and hls.get("video_url"):
+        return hls["video_url"]
+    return None
+
+
+def hls_thumbnail(record):
+    hls = record.get("hls") if isinstance(record, dict) else None
+    thumbnails = hls.get("thumbnail_urls") if hls else None
+    return thumbnails[0] if thumbnails else None
@@ -0,0 +1,31 @@
+from olympics.cache import SQLiteCache, TTLCache, TieredCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_disk_hit_keeps_its_remaining_lifetime_in_memory(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=3600)
+    disk.set("key", "value", ttl=5)
+    clock = FakeClock()
+    cache = TieredCache(TTLCache(ttl=3600, clock=clock), disk)
+
+    assert cache.get("key") == "value"
+    assert cache.memory.get("key") == "value"
+    clock.now += 10
+    assert cache.memory.get("key") is None
+
+
+def test_get_with_ttl_reports_the_remaining_lifetime(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=3600)
+    disk.set("key", "value", ttl=60)
+    value, remaining = disk.get_with_ttl("key")
+    assert value == "value"
+    assert 0 < remaining <= 60
+    assert disk.get_with_ttl("missing") is None
+    assert disk.get("missing", "default") == "default"
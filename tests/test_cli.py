@@ -0,0 +1,28 @@
+from benchmarks.stub_backend import StubVideoSession
+from olympics.cli import resolve_video_urls
+from olympics.rate_limit import RequestScheduler
+from olympics.video_resolver import VideoResolver
+
+
+VIDEO_IDS = [f"video-{n}" for n in range(40)]
+
+
+def throttled_resolver():
+    # At 20 lookups/s only about ten fit in one resolve() deadline.
+    session = StubVideoSession(latency=0.0)
+    scheduler = RequestScheduler(rate=20, burst=1)
+    resolver = VideoResolver("test-key", "test-index", session=session, timeout=0.5, max_retries=0,
+                             scheduler=scheduler)
+    return session, resolver
+
+
+def test_chunked_resolve_stays_inside_the_deadline():
+    session, resolver = throttled_resolver()
+    try:
+        video_urls, failed = resolve_video_urls(resolver, VIDEO_IDS + VIDEO_IDS[:5], chunk_size=5)
+    finally:
+        resolver.close()
+    assert not failed
+    assert set(video_urls) == set(VIDEO_IDS)
+    assert all(video_urls.values())
+    assert session.call_count == len(VIDEO_IDS)
@@ -0,0 +1,78 @@
+from benchmarks.stub_backend import StubTwelveLabs, StubVideoSession
+from olympics.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpen
+from olympics.classes import INITIAL_CLASSES
+from olympics.search_engine import ConcurrentSearchEngine
+from olympics.video_resolver import VideoResolver
+
+
+PROMPTS = INITIAL_CLASSES[0]["prompts"]
+VIDEO_IDS = [f"video-{n}" for n in range(6)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def half_open_breaker(name):
+    # A breaker that has opened and waited out its reset timeout.
+    clock = FakeClock()
+    breaker = CircuitBreaker(name, failure_threshold=1, reset_timeout=30.0, clock=clock)
+    breaker.record_failure()
+    clock.now += 30.0
+    return breaker
+
+
+def half_open_engine(error_rate=0.0):
+    breaker = half_open_breaker("search")
+    client = StubTwelveLabs(latency=0.01, error_rate=error_rate)
+    return client, breaker, ConcurrentSearchEngine(client, "test-index", max_workers=8, breaker=breaker)
+
+
+def test_successful_probe_lets_the_rest_fan_out():
+    client, breaker, engine = half_open_engine()
+    results, errors = engine.search(PROMPTS)
+    assert list(results) == PROMPTS
+    assert not errors
+    assert client.search.calls[0] == PROMPTS[0]
+    assert client.call_count == len(PROMPTS)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_keeps_the_rest_off_the_api():
+    client, breaker, engine = half_open_engine(error_rate=1.0)
+    results, errors = engine.search(PROMPTS)
+    assert not results
+    assert client.search.calls == [PROMPTS[0]]
+    assert all(isinstance(errors[prompt], CircuitOpen) for prompt in PROMPTS[1:])
+    assert breaker.state == OPEN
+
+
+def half_open_resolver(error_rate=0.0):
+    breaker = half_open_breaker("videos")
+    session = StubVideoSession(latency=0.01, error_rate=error_rate)
+    resolver = VideoResolver("test-key", "test-index", session=session, max_retries=0, breaker=breaker)
+    return session, breaker, resolver
+
+
+def test_successful_video_probe_lets_the_rest_fan_out():
+    session, breaker, resolver = half_open_resolver()
+    records, errors = resolver.resolve(VIDEO_IDS)
+    assert set(records) == set(VIDEO_IDS)
+    assert not errors
+    assert session.calls[0] == VIDEO_IDS[0]
+    assert session.call_count == len(VIDEO_IDS)
+    assert breaker.state == CLOSED
+
+
+def test_failed_video_probe_keeps_the_rest_off_the_api():
+    session, breaker, resolver = half_open_resolver(error_rate=1.0)
+    records, errors = resolver.resolve(VIDEO_IDS)
+    assert not records
+    assert session.calls == [VIDEO_IDS[0]]
+    assert not isinstance(errors[VIDEO_IDS[0]], CircuitOpen)
+    assert all(isinstance(errors[video_id], CircuitOpen) for video_id in VIDEO_IDS[1:])
+    assert breaker.state == OPEN
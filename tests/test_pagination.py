@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from olympics.pagination import PagedResults
+
+
+def make_page(token, next_token, size=3):
+    return SimpleNamespace(
+        data=[SimpleNamespace(id=f"{token}-{i}", clips=[object()]) for i in range(size)],
+        page_info=SimpleNamespace(next_page_token=next_token)
+    )
+
+
+def test_failed_prefetch_is_retried_directly():
+    calls = []
+
+    def fetch_page(token):
+        calls.append(token)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return make_page(token, None)
+
+    pager = PagedResults(make_page("first", "second"), fetch_page)
+    pager.items(3)
+    pager._prefetched[1].exception()  # let the failing prefetch finish
+    for _ in range(3):
+        assert len(pager.items(6)) == 6
+    assert calls == ["second", "second"]
@@ -0,0 +1,33 @@
+from olympics.prompt_index import PromptIndex
+
+
+THRESHOLD = 0.85
+
+
+def nearest(indexed, prompt):
+    index = PromptIndex()
+    index.add(indexed)
+    match = index.nearest(prompt, threshold=THRESHOLD)
+    return match[0] if match else None
+
+
+def test_rewordings_reuse_the_indexed_prompt():
+    assert nearest("swimming competition", "Swimming-Competitions") == "swimming competition"
+    assert nearest("tennis match", "tennis matches") == "tennis match"
+    assert nearest("diving event", "diving events") == "diving event"
+    assert nearest("boxing match", "Boxing match!") == "boxing match"
+
+
+def test_different_words_are_never_reused():
+    assert nearest("mens tennis match", "womens tennis match") is None
+    assert nearest("mens tennis match", "tennis match") is None
+    assert nearest("swimming competition", "no swimming competition") is None
+    assert nearest("swimming competition", "swim race") is None
+
+
+def test_closest_prompt_with_the_same_words_wins():
+    index = PromptIndex()
+    for prompt in ("mens tennis match", "tennis doubles match", "tennis match"):
+        index.add(prompt)
+    assert index.nearest("Tennis matches", threshold=THRESHOLD)[0] == "tennis match"
+    assert index.nearest("womens tennis match", threshold=THRESHOLD) is None
@@ -0,0 +1,44 @@
+import requests
+
+from benchmarks.stub_backend import StubAPIError, StubResponse, StubTwelveLabs
+from olympics.circuit_breaker import is_outage
+from olympics.classes import INITIAL_CLASSES
+from olympics.rate_limit import RequestScheduler, is_rate_limited
+from olympics.search_engine import ConcurrentSearchEngine
+
+
+URL = "https://api.twelvelabs.io/v1.3/indexes/66f4291ab/videos/429abc"
+
+
+def http_error(status_code):
+    return requests.exceptions.HTTPError(f"{status_code} Error for url: {URL}", response=StubResponse(status_code))
+
+
+def test_status_429_is_rate_limited():
+    assert is_rate_limited(StubAPIError(429, "Too Many Requests"))
+    assert is_rate_limited(http_error(429))
+
+
+def test_other_statuses_ignore_429_in_the_message():
+    assert not is_rate_limited(http_error(404))
+    assert not is_rate_limited(StubAPIError(500, f"Internal Server Error for {URL}"))
+    assert is_outage(StubAPIError(500, f"Internal Server Error for {URL}"))
+
+
+def test_message_is_only_checked_without_a_status():
+    assert is_rate_limited(RuntimeError("Too Many Requests"))
+    assert is_rate_limited(RuntimeError("rate limit exceeded"))
+    assert not is_rate_limited(RuntimeError(f"Connection reset for {URL}"))
+
+
+def test_time_waiting_for_a_token_does_not_count_against_the_timeout():
+    # Six prompts at two calls a second take far longer than the timeout,
+    # but each call on its own finishes well inside it.
+    prompts = INITIAL_CLASSES[0]["prompts"] + INITIAL_CLASSES[1]["prompts"][:1]
+    client = StubTwelveLabs(latency=0.01)
+    engine = ConcurrentSearchEngine(client, "test-index", timeout=0.5,
+                                    scheduler=RequestScheduler(rate=2, burst=1))
+    results, errors = engine.search(prompts)
+    assert not errors
+    assert list(results) == prompts
+    assert client.call_count == len(prompts)
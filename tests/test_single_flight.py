@@ -0,0 +1,64 @@
+import threading
+import time
+
+from benchmarks.stub_backend import StubTwelveLabs
+from olympics.cache import TTLCache, TieredCache
+from olympics.classes import INITIAL_CLASSES
+from olympics.search_engine import ConcurrentSearchEngine
+from olympics.singleflight import SingleFlight
+
+
+ALL_PROMPTS = [prompt for cls in INITIAL_CLASSES for prompt in cls["prompts"]]
+
+
+def run_sessions(prompt_orders, latency=0.05, stagger=0.0):
+    # One engine per session, as each Streamlit script run builds its own,
+    # sharing the process-wide cache and single-flight group.
+    client = StubTwelveLabs(latency=latency)
+    cache = TieredCache(TTLCache(maxsize=1024, ttl=3600))
+    single_flight = SingleFlight()
+    barrier = threading.Barrier(len(prompt_orders))
+    results = [None] * len(prompt_orders)
+    errors = [None] * len(prompt_orders)
+
+    def session(n, prompts):
+        engine = ConcurrentSearchEngine(client, "test-index", max_workers=8, cache=cache, single_flight=single_flight)
+        barrier.wait()
+        time.sleep(n * stagger)
+        results[n], errors[n] = engine.search(prompts)
+
+    threads = [threading.Thread(target=session, args=(n, prompts)) for n, prompts in enumerate(prompt_orders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return client, results, errors
+
+
+def test_concurrent_sessions_share_one_call_per_prompt():
+    prompts = INITIAL_CLASSES[4]["prompts"]
+    client, results, errors = run_sessions([prompts] * 20)
+    assert client.call_count == len(prompts)
+    assert all(list(result) == prompts for result in results)
+    assert not any(errors)
+
+
+def test_staggered_reordered_sessions_reuse_cached_results():
+    # The second session starts while the first is mid-way and walks the
+    # prompts in reverse, so most of its calls come due after the first
+    # session's call for that prompt has finished and left the group.
+    client, results, errors = run_sessions([ALL_PROMPTS, ALL_PROMPTS[::-1]], stagger=0.1)
+    assert client.call_count == len(ALL_PROMPTS)
+    assert sorted(client.search.calls) == sorted(ALL_PROMPTS)
+    assert all(set(result) == set(ALL_PROMPTS) for result in results)
+    assert not any(errors)
+
+
+def test_refresh_bypasses_the_cache():
+    client = StubTwelveLabs(latency=0.0)
+    cache = TieredCache(TTLCache(maxsize=1024, ttl=3600))
+    engine = ConcurrentSearchEngine(client, "test-index", cache=cache, single_flight=SingleFlight())
+    prompts = INITIAL_CLASSES[0]["prompts"]
+    list(engine.iter_search(prompts))
+    list(engine.iter_search(prompts, refresh=True))
+    assert client.call_count == 2 * len(prompts)